@@ -0,0 +1,231 @@
+"""Headless throughput benchmarks for Game.update and Game.draw.
+
+Runs fixed scenarios under SDL's dummy video driver and reports frames per
+second, per-call latency percentiles and per-frame allocations. Results can
+be saved as a baseline and later runs compared against it:
+
+    python bench_flappy.py --save-baseline bench_baseline.json
+    python bench_flappy.py --baseline bench_baseline.json   # exit 1 on regression
+
+The "startup" scenario times import-to-first-frame in fresh interpreters.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import flappy_bird
+from flappy_bird import Game, JetPlane, FlockEngine, CrowdPilot, SCREEN_WIDTH, PIPE_WIDTH
+
+def autopilot(engine):
+    """Cheap flap rule that survives long enough to keep pipes on screen"""
+    character = engine.character
+    gap_top = 160
+    for pipe in engine.pipes:
+        if pipe.x + PIPE_WIDTH >= character.x - character.size:
+            gap_top = pipe.height
+            break
+    return character.y > gap_top + 125 and character.velocity > 0
+
+def start_game(character, jets=0, **options):
+    game = Game(**options)
+    game.selected_character = character
+    game.character_selection = False
+    game.reset_game()
+    game.game_started = True
+    set_jets(game, jets)
+    return game
+
+def set_jets(game, count):
+    """Keep exactly `count` jets on screen, with contrails already full"""
+    game.jet_timer = -10 ** 9  # No random spawns
+    game.jets = []
+    for i in range(count):
+        direction = 1 if i % 2 == 0 else -1
+        jet = JetPlane(SCREEN_WIDTH // 2, 50 + (i * 37) % 160, direction)
+        jet.speed = 0
+        for _ in range(300):
+            jet.update()
+        game.jets.append(jet)
+
+def start_flock(count):
+    names = [("bird", "mario")[i % 2] for i in range(count)]
+    return Game(flock=FlockEngine(names), flock_policy=CrowdPilot(count, seed=1), flock_seed=1)
+
+def play_frame(game):
+    if game.game_over:
+        game.reset_game()
+        game.game_started = True
+    if autopilot(game.engine):
+        game.request_flap()
+
+def scenario(name, frames, setup, before_frame=play_frame):
+    return {"name": name, "frames": frames, "setup": setup, "before_frame": before_frame}
+
+SCENARIOS = [
+    scenario("bird", 1200, lambda: start_game("bird")),
+    scenario("mario", 1200, lambda: start_game("mario")),
+    scenario("jets_0", 600, lambda: start_game("bird", jets=0)),
+    scenario("jets_3", 600, lambda: start_game("bird", jets=3)),
+    scenario("jets_10", 600, lambda: start_game("bird", jets=10)),
+    scenario("character_selection", 600, lambda: Game(), before_frame=lambda game: None),
+    scenario("long_run", 10000, lambda: start_game("bird")),
+    scenario("flock_100", 600, lambda: start_flock(100), before_frame=lambda game: None),
+    scenario("flock_1000", 600, lambda: start_flock(1000), before_frame=lambda game: None),
+    scenario("scaled_smooth", 600, lambda: start_game("bird", window_size=(720, 1080), render_scale=1.0)),
+    scenario("scaled_half", 600, lambda: start_game("bird", window_size=(720, 1080), render_scale=0.5)),
+    scenario("scaled_nearest", 600, lambda: start_game("bird", window_size=(720, 1080), render_scale=0.0)),
+]
+
+# Runs in a fresh interpreter; prints import, Game() and first-draw seconds
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+import flappy_bird
+imported = time.perf_counter()
+game = flappy_bird.Game()
+created = time.perf_counter()
+game.draw()
+drawn = time.perf_counter()
+print(imported - started, created - imported, drawn - created)
+"""
+
+def run_startup(runs):
+    """Median import-to-first-frame breakdown over `runs` cold interpreters"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", STARTUP_PROBE], check=True,
+                                capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        samples.append([float(value) * 1000 for value in output.split()[-3:]])
+    def median(values):
+        return sorted(values)[len(values) // 2]
+    return {"runs": runs, "total_ms": median([sum(sample) for sample in samples]),
+            "import_ms": median([sample[0] for sample in samples]),
+            "init_ms": median([sample[1] for sample in samples]),
+            "first_draw_ms": median([sample[2] for sample in samples])}
+
+def percentiles(values):
+    values = sorted(values)
+    def pick(p):
+        return values[min(len(values) - 1, int(p / 100 * len(values)))] / 1000
+    return {"p50_us": pick(50), "p95_us": pick(95), "p99_us": pick(99),
+            "max_us": values[-1] / 1000}
+
+def run_scenario(spec, seed=1234):
+    random.seed(seed)  # Jet spawns still use the global generator
+    game = spec["setup"]()
+    update_ns = []
+    draw_ns = []
+    for _ in range(spec["frames"]):
+        spec["before_frame"](game)
+        start = time.perf_counter_ns()
+        game.update()
+        middle = time.perf_counter_ns()
+        game.draw()
+        end = time.perf_counter_ns()
+        update_ns.append(middle - start)
+        draw_ns.append(end - middle)
+
+    # Allocations, measured in a separate pass since tracing slows everything down
+    sample = min(spec["frames"], 300)
+    tracemalloc.start()
+    peaks = []
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(sample):
+        spec["before_frame"](game)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        game.update()
+        game.draw()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    net_blocks = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    total_s = (sum(update_ns) + sum(draw_ns)) / 1e9
+    peaks.sort()
+    return {
+        "frames": spec["frames"],
+        "fps": spec["frames"] / total_s,
+        "update": percentiles(update_ns),
+        "draw": percentiles(draw_ns),
+        "alloc_peak_bytes_per_frame": peaks[len(peaks) // 2],
+        "net_blocks_per_frame": net_blocks / sample,
+    }
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions against a baseline run"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if name == "startup":
+            now, then = result["total_ms"], base["total_ms"]
+            if now > then * (1 + tolerance) and now - then > 5:
+                regressions.append(f"startup: {now:.0f}ms > baseline {then:.0f}ms")
+            continue
+        if result["fps"] < base["fps"] * (1 - tolerance):
+            regressions.append(f"{name}: fps {result['fps']:.0f} < baseline {base['fps']:.0f}")
+        for call in ("update", "draw"):
+            now, then = result[call]["p95_us"], base[call]["p95_us"]
+            if now > then * (1 + tolerance) and now - then > 5:
+                regressions.append(f"{name}: {call} p95 {now:.1f}us > baseline {then:.1f}us")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved run")
+    parser.add_argument("--save-baseline", metavar="FILE", help="save this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed relative slowdown before flagging (default: %(default)s)")
+    parser.add_argument("--startup-runs", type=int, default=10,
+                        help="cold starts timed by the startup scenario (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    selected = [spec for spec in SCENARIOS if not args.scenarios or spec["name"] in args.scenarios]
+    results = {}
+    if not args.scenarios or "startup" in args.scenarios:
+        result = results["startup"] = run_startup(args.startup_runs)
+        if not args.json:
+            print(f"{'startup':<20} {result['total_ms']:9.1f} ms   "
+                  f"import {result['import_ms']:.1f}ms  Game() {result['init_ms']:.1f}ms  "
+                  f"first draw {result['first_draw_ms']:.1f}ms  (median of {result['runs']})")
+    for spec in selected:
+        result = results[spec["name"]] = run_scenario(spec)
+        if not args.json:
+            print(f"{spec['name']:<20} {result['fps']:9.0f} fps  "
+                  f"update p50/p95/p99 {result['update']['p50_us']:7.1f}/"
+                  f"{result['update']['p95_us']:7.1f}/{result['update']['p99_us']:7.1f}us  "
+                  f"draw p50/p95/p99 {result['draw']['p50_us']:7.1f}/"
+                  f"{result['draw']['p95_us']:7.1f}/{result['draw']['p99_us']:7.1f}us  "
+                  f"alloc {result['alloc_peak_bytes_per_frame']:6d} B/frame")
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    run = {"pygame": pygame.version.ver, "python": sys.version.split()[0],
+           "module": os.path.basename(flappy_bird.__file__), "results": results}
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Vectorized batch environment: many independent Flappy games in NumPy arrays.
+
+Every game follows exactly the same rules as FlappyEngine (same float
+physics, same pygame.Rect truncation for collisions, same per-seed pipe
+course), but a single step() advances all of them at once.
+"""
+import numpy as np
+
+from flappy_bird import (SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY, JUMP_STRENGTH, PIPE_WIDTH,
+                         PIPE_GAP, PIPE_SPEED, PIPE_INTERVAL, GROUND_HEIGHT, CHARACTER_X,
+                         CHARACTER_SIZE, MAX_PIPES, SEEDED_COURSES)
+
+class FlappyBatchEnv:
+    """N Flappy games advanced together by one vectorized step(actions)"""
+    def __init__(self, num_envs, seeds=None, courses=None):
+        self.num_envs = num_envs
+        n = num_envs
+        self.y = np.zeros(n, dtype=np.float64)
+        self.velocity = np.zeros(n, dtype=np.float64)
+        self.done = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.pipe_timer = np.zeros(n, dtype=np.int64)
+        self.pipe_x = np.zeros((n, MAX_PIPES), dtype=np.int64)
+        self.pipe_height = np.zeros((n, MAX_PIPES), dtype=np.int64)
+        self.pipe_alive = np.zeros((n, MAX_PIPES), dtype=bool)
+        self.pipe_passed = np.zeros((n, MAX_PIPES), dtype=bool)
+        # One course stream per game, from the same source FlappyEngine(seed) uses
+        self.courses = courses or SEEDED_COURSES
+        self.streams = [None] * n
+        self.reset(seeds)
+
+    def reset(self, seeds=None, mask=None):
+        """Reset all games, or only those where mask is True.
+
+        seeds is a sequence with one entry per reset game (None for an
+        unseeded course).
+        """
+        indices = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        if seeds is None:
+            seeds = [None] * len(indices)
+        for i, seed in zip(indices, seeds):
+            self.streams[i] = self.courses.heights(seed)
+        self.y[indices] = SCREEN_HEIGHT // 2
+        self.velocity[indices] = 0
+        self.done[indices] = False
+        self.score[indices] = 0
+        self.frame[indices] = 0
+        self.pipe_timer[indices] = 0
+        self.pipe_alive[indices] = False
+        self.pipe_passed[indices] = False
+
+    def step(self, actions):
+        """Advance every unfinished game one frame.
+
+        actions is a boolean array (flap or not) per game. Returns the
+        per-game reward (pipes passed this frame) and the done flags.
+        """
+        live = ~self.done
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        if not live.any():
+            return rewards, self.done
+
+        # Character physics
+        flap = live & np.asarray(actions, dtype=bool)
+        self.velocity[flap] = JUMP_STRENGTH
+        self.velocity[live] += GRAVITY
+        self.y[live] += self.velocity[live]
+        self.frame[live] += 1
+
+        # Check boundaries
+        self.done |= live & ((self.y <= 0) | (self.y >= SCREEN_HEIGHT - GROUND_HEIGHT))
+
+        # Spawn pipes (Python loop only over the games spawning this frame)
+        self.pipe_timer[live] += 1
+        spawning = np.flatnonzero(live & (self.pipe_timer >= PIPE_INTERVAL))
+        if len(spawning):
+            slots = np.argmin(self.pipe_alive[spawning], axis=1)
+            self.pipe_height[spawning, slots] = [next(self.streams[i]) for i in spawning]
+            self.pipe_x[spawning, slots] = SCREEN_WIDTH
+            self.pipe_alive[spawning, slots] = True
+            self.pipe_passed[spawning, slots] = False
+            self.pipe_timer[spawning] = 0
+
+        # Update pipes
+        moving = self.pipe_alive & live[:, None]
+        self.pipe_x[moving] -= PIPE_SPEED
+
+        # Check collision, mirroring pygame.Rect.colliderect on truncated coordinates
+        top = np.trunc(self.y - CHARACTER_SIZE)[:, None]
+        bottom = top + CHARACTER_SIZE * 2
+        left = CHARACTER_X - CHARACTER_SIZE
+        overlap_x = (self.pipe_x < left + CHARACTER_SIZE * 2) & (left < self.pipe_x + PIPE_WIDTH)
+        hit_top = top < self.pipe_height
+        hit_bottom = bottom > self.pipe_height + PIPE_GAP
+        hit = moving & overlap_x & (hit_top | hit_bottom)
+        self.done |= hit.any(axis=1)
+
+        # Check if character passed the pipe
+        passing = moving & ~self.pipe_passed & (self.pipe_x + PIPE_WIDTH < CHARACTER_X)
+        self.pipe_passed |= passing
+        rewards += passing.sum(axis=1)
+        self.score += rewards
+
+        # Remove off-screen pipes
+        self.pipe_alive &= ~(moving & (self.pipe_x + PIPE_WIDTH < 0))
+        return rewards, self.done
+
+    def observe(self):
+        """Per-game (y, velocity, next pipe dx, next pipe gap top) as an (N, 4) array"""
+        ahead = self.pipe_alive & (self.pipe_x + PIPE_WIDTH >= CHARACTER_X - CHARACTER_SIZE)
+        dx = np.where(ahead, self.pipe_x - CHARACTER_X, SCREEN_WIDTH)
+        nearest = np.argmin(dx, axis=1)
+        rows = np.arange(self.num_envs)
+        has_pipe = ahead[rows, nearest]
+        gap_top = np.where(has_pipe, self.pipe_height[rows, nearest],
+                           (SCREEN_HEIGHT - GROUND_HEIGHT - PIPE_GAP) // 2)
+        return np.stack([self.y, self.velocity, dx[rows, nearest], gap_top], axis=1)
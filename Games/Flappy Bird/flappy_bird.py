@@ -1,22 +1,42 @@
+import argparse
+import os
 import pygame
 import sys
 import random
 import math
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 
-# Initialize Pygame
-pygame.init()
+import numpy as np
+
+from flappy_replay import MAX_SEED, Replay, ReplayError
+from frame_profiler import FrameProfiler, NullProfiler, LatencyLog, LatencyProbe
+from frame_capture import FrameCapture, open_sink
+from render_scaler import RenderScaler, RENDER_SCALES
+from flappy_course import CourseBank, CourseError, SeededCourses
+
+# No pygame.init() here: importing the module must stay side-effect free for
+# headless tools. The display comes up with the window and fonts on first use.
 
 # Game Constants
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # Render rate cap
+SIM_HZ = 60  # Simulation ticks per second; physics constants below are per tick
+MAX_FRAME_TIME = 0.25  # Longest wall-clock gap the simulation will catch up on
 GRAVITY = 0.5
 JUMP_STRENGTH = -8
 PIPE_WIDTH = 70
 PIPE_GAP = 180
 PIPE_SPEED = 3
+PIPE_INTERVAL = 90  # Frames between pipe spawns
 GROUND_HEIGHT = 100
+CHARACTER_X = 100  # Characters fly at a fixed x; the pipes move
+CHARACTER_SIZE = 30  # Half the collision box side
+# Pipes live (SCREEN_WIDTH + PIPE_WIDTH) / PIPE_SPEED frames, one spawns every PIPE_INTERVAL
+MAX_PIPES = (SCREEN_WIDTH + PIPE_WIDTH) // (PIPE_SPEED * PIPE_INTERVAL) + 2
+PIPE_HEIGHTS = (100, SCREEN_HEIGHT - GROUND_HEIGHT - PIPE_GAP - 100)  # Top pipe height range
 
 # Colors
 WHITE = (255, 255, 255)
@@ -34,13 +54,121 @@ GRAY = (128, 128, 128)
 DARK_GRAY = (64, 64, 64)
 LIGHT_GRAY = (192, 192, 192)
 
+# Font sizes
+FONT_SIZE = 48
+SMALL_FONT_SIZE = 36
+TINY_FONT_SIZE = 24
+
+class TextCache:
+    """Shared LRU cache of rendered text.
+
+    Fonts are created once per (name, size). Rendered surfaces are keyed by
+    font, size, string and colours; with a shadow colour the entry is the
+    text composited over its offset drop shadow, ready for a single blit.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.entries = OrderedDict()
+
+    def get_font(self, size, name=None):
+        font = self.fonts.get((name, size))
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.Font(name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def render(self, text, size, color, shadow=None, shadow_offset=2, name=None):
+        key = (name, size, text, color, shadow, shadow_offset)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+
+        font = self.get_font(size, name)
+        text_surface = font.render(text, True, color)
+        if shadow is None:
+            surface = text_surface
+        else:
+            surface = self.composite_shadow(text_surface, font.render(text, True, shadow),
+                                            shadow_offset)
+
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    @staticmethod
+    def composite_shadow(text_surface, shadow_surface, offset):
+        """Exact straight-alpha "over" of the text on its offset shadow.
+
+        Blitting one SRCALPHA surface onto another does not renormalise
+        colour by the resulting alpha, which darkens anti-aliased edges, so
+        the two layers are blended with NumPy once per cache entry.
+        """
+        width, height = text_surface.get_size()
+        surface = pygame.Surface((width + offset, height + offset), pygame.SRCALPHA)
+        text_alpha = np.zeros((width + offset, height + offset))
+        shadow_alpha = np.zeros_like(text_alpha)
+        text_alpha[:width, :height] = pygame.surfarray.array_alpha(text_surface) / 255
+        shadow_alpha[offset:, offset:] = pygame.surfarray.array_alpha(shadow_surface) / 255
+        text_rgb = np.zeros((width + offset, height + offset, 3))
+        shadow_rgb = np.zeros_like(text_rgb)
+        text_rgb[:width, :height] = pygame.surfarray.array3d(text_surface)
+        shadow_rgb[offset:, offset:] = pygame.surfarray.array3d(shadow_surface)
+
+        shadow_weight = shadow_alpha * (1 - text_alpha)
+        alpha = text_alpha + shadow_weight
+        rgb = (text_rgb * text_alpha[..., None] + shadow_rgb * shadow_weight[..., None])
+        rgb /= np.maximum(alpha, 1e-9)[..., None]
+        pygame.surfarray.pixels3d(surface)[...] = np.rint(rgb)
+        pygame.surfarray.pixels_alpha(surface)[...] = np.rint(alpha * 255)
+        return surface
+
+text_cache = TextCache()
+
+# Rasterised character frames, keyed by (character class, animation frame)
+_sprite_cache = {}
+SPRITE_COLORKEY = (255, 0, 255)  # Never used in a sprite
+
+def to_display_sprite(surface):
+    """Display-format copy of an SRCALPHA sprite for fast blitting.
+
+    pygame.draw never anti-aliases, so sprites are usually fully opaque or
+    fully transparent per pixel; those become colour-keyed RLE surfaces,
+    which blit several times faster than per-pixel alpha.
+    """
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    binary = bool(((alpha == 0) | (alpha == 255)).all())
+    del alpha  # Unlock the surface
+    if not binary:
+        return surface.convert_alpha()
+    keyed = pygame.Surface(surface.get_size())
+    keyed.fill(SPRITE_COLORKEY)
+    keyed.blit(surface, (0, 0))
+    keyed = keyed.convert()
+    keyed.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+    return keyed
+
 class Character(ABC):
     """Base class for all playable characters"""
+    # Sprite surface size and where the character's centre sits on it
+    sprite_size = (100, 70)
+    sprite_origin = (50, 35)
+    sprite_frames = (0,)  # Every value sprite_frame() can return
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position at the start of the current tick
+        self.prev_y = y
         self.velocity = 0
-        self.size = 30
+        self.size = CHARACTER_SIZE
+
+    def save_position(self):
+        self.prev_x, self.prev_y = self.x, self.y
         
     def jump(self):
         self.velocity = JUMP_STRENGTH
@@ -48,10 +176,42 @@ class Character(ABC):
     def update(self):
         self.velocity += GRAVITY
         self.y += self.velocity
+
+    def advance(self, frames):
+        """Apply `frames` updates at once along the closed-form no-flap path"""
+        self.y += frames * self.velocity + GRAVITY * frames * (frames + 1) / 2
+        self.velocity += frames * GRAVITY
         
+    def sprite_frame(self):
+        """Key of the current animation frame; the sprite depends on nothing else"""
+        return 0
+
+    def set_sprite_frame(self, frame):
+        """Put the animation into the state sprite_frame() reports as `frame`"""
+        pass
+
     @abstractmethod
-    def draw(self, screen):
+    def draw_frame(self, surface, x, y):
+        """Draw the current animation frame centred on (x, y)"""
         pass
+
+    def get_sprite(self):
+        key = (type(self), self.sprite_frame())
+        sprite = _sprite_cache.get(key)
+        if sprite is None:
+            sprite = pygame.Surface(self.sprite_size, pygame.SRCALPHA)
+            self.draw_frame(sprite, *self.sprite_origin)
+            if pygame.display.get_surface() is not None:
+                sprite = to_display_sprite(sprite)
+            _sprite_cache[key] = sprite
+        return sprite
+
+    def draw(self, screen, alpha=1.0):
+        """Blit the sprite between the last two tick positions (alpha 0..1)"""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        origin_x, origin_y = self.sprite_origin
+        return screen.blit(self.get_sprite(), (int(x) - origin_x, int(y) - origin_y))
     
     def get_rect(self):
         return pygame.Rect(self.x - self.size, self.y - self.size, 
@@ -59,6 +219,8 @@ class Character(ABC):
 
 class Bird(Character):
     """Flappy Bird character"""
+    sprite_frames = (0, 1, 2)
+
     def __init__(self, x, y):
         super().__init__(x, y)
         self.wing_state = 0  # For wing animation
@@ -71,66 +233,82 @@ class Bird(Character):
         if self.wing_timer >= 10:
             self.wing_state = (self.wing_state + 1) % 3
             self.wing_timer = 0
+
+    def advance(self, frames):
+        super().advance(frames)
+        ticks = self.wing_timer + frames
+        self.wing_state = (self.wing_state + ticks // 10) % 3
+        self.wing_timer = ticks % 10
     
-    def draw(self, screen):
+    def sprite_frame(self):
+        return self.wing_state
+
+    def set_sprite_frame(self, frame):
+        self.wing_state = frame
+
+    def draw_frame(self, surface, x, y):
         # Draw bird body (circle)
-        pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), self.size)
-        pygame.draw.circle(screen, ORANGE, (int(self.x), int(self.y)), self.size, 2)
+        pygame.draw.circle(surface, YELLOW, (int(x), int(y)), self.size)
+        pygame.draw.circle(surface, ORANGE, (int(x), int(y)), self.size, 2)
         
         # Draw eye
-        eye_x = self.x + 10
-        eye_y = self.y - 5
-        pygame.draw.circle(screen, WHITE, (int(eye_x), int(eye_y)), 8)
-        pygame.draw.circle(screen, BLACK, (int(eye_x + 3), int(eye_y)), 4)
+        eye_x = x + 10
+        eye_y = y - 5
+        pygame.draw.circle(surface, WHITE, (int(eye_x), int(eye_y)), 8)
+        pygame.draw.circle(surface, BLACK, (int(eye_x + 3), int(eye_y)), 4)
         
         # Draw beak
         beak_points = [
-            (self.x + self.size, self.y),
-            (self.x + self.size + 15, self.y + 3),
-            (self.x + self.size, self.y + 8)
+            (x + self.size, y),
+            (x + self.size + 15, y + 3),
+            (x + self.size, y + 8)
         ]
-        pygame.draw.polygon(screen, ORANGE, beak_points)
+        pygame.draw.polygon(surface, ORANGE, beak_points)
         
         # Draw animated wings
         if self.wing_state == 0:  # Wings up
             wing_points = [
-                (self.x - 10, self.y - 5),
-                (self.x - 25, self.y - 20),
-                (self.x - 30, self.y - 10),
-                (self.x - 15, self.y + 5)
+                (x - 10, y - 5),
+                (x - 25, y - 20),
+                (x - 30, y - 10),
+                (x - 15, y + 5)
             ]
-            pygame.draw.polygon(screen, YELLOW, wing_points)
-            pygame.draw.polygon(screen, ORANGE, wing_points, 2)
+            pygame.draw.polygon(surface, YELLOW, wing_points)
+            pygame.draw.polygon(surface, ORANGE, wing_points, 2)
         elif self.wing_state == 1:  # Wings middle
             wing_points = [
-                (self.x - 10, self.y),
-                (self.x - 30, self.y - 5),
-                (self.x - 30, self.y + 5),
-                (self.x - 15, self.y + 8)
+                (x - 10, y),
+                (x - 30, y - 5),
+                (x - 30, y + 5),
+                (x - 15, y + 8)
             ]
-            pygame.draw.polygon(screen, YELLOW, wing_points)
-            pygame.draw.polygon(screen, ORANGE, wing_points, 2)
+            pygame.draw.polygon(surface, YELLOW, wing_points)
+            pygame.draw.polygon(surface, ORANGE, wing_points, 2)
         else:  # Wings down
             wing_points = [
-                (self.x - 10, self.y + 5),
-                (self.x - 25, self.y + 15),
-                (self.x - 30, self.y + 8),
-                (self.x - 15, self.y)
+                (x - 10, y + 5),
+                (x - 25, y + 15),
+                (x - 30, y + 8),
+                (x - 15, y)
             ]
-            pygame.draw.polygon(screen, YELLOW, wing_points)
-            pygame.draw.polygon(screen, ORANGE, wing_points, 2)
+            pygame.draw.polygon(surface, YELLOW, wing_points)
+            pygame.draw.polygon(surface, ORANGE, wing_points, 2)
         
         # Draw tail
         tail_points = [
-            (self.x - self.size + 5, self.y - 5),
-            (self.x - self.size - 10, self.y - 10),
-            (self.x - self.size - 10, self.y + 10),
-            (self.x - self.size + 5, self.y + 5)
+            (x - self.size + 5, y - 5),
+            (x - self.size - 10, y - 10),
+            (x - self.size - 10, y + 10),
+            (x - self.size + 5, y + 5)
         ]
-        pygame.draw.polygon(screen, ORANGE, tail_points)
+        pygame.draw.polygon(surface, ORANGE, tail_points)
 
 class Mario(Character):
     """Super Mario character"""
+    sprite_size = (80, 70)
+    sprite_origin = (40, 45)
+    sprite_frames = (False, True)
+
     def __init__(self, x, y):
         super().__init__(x, y)
         self.jump_frame = 0  # Animation frame when jumping
@@ -147,116 +325,198 @@ class Mario(Character):
             self.jump_frame += 1
             if self.jump_frame > 20:
                 self.is_jumping = False
+
+    def advance(self, frames):
+        super().advance(frames)
+        if self.is_jumping:
+            self.jump_frame = min(self.jump_frame + frames, 21)
+            if self.jump_frame > 20:
+                self.is_jumping = False
     
-    def draw(self, screen):
+    def sprite_frame(self):
+        return self.is_jumping
+
+    def set_sprite_frame(self, frame):
+        self.is_jumping = frame
+
+    def draw_frame(self, surface, x, y):
         # Draw Mario's body
-        body_rect = pygame.Rect(self.x - 20, self.y - 15, 40, 30)
-        pygame.draw.rect(screen, RED, body_rect)
+        body_rect = pygame.Rect(x - 20, y - 15, 40, 30)
+        pygame.draw.rect(surface, RED, body_rect)
         
         # Draw overalls
-        overall_rect = pygame.Rect(self.x - 20, self.y, 40, 15)
-        pygame.draw.rect(screen, BLUE, overall_rect)
+        overall_rect = pygame.Rect(x - 20, y, 40, 15)
+        pygame.draw.rect(surface, BLUE, overall_rect)
         
         # Draw buttons
-        pygame.draw.circle(screen, YELLOW, (int(self.x - 8), int(self.y + 5)), 2)
-        pygame.draw.circle(screen, YELLOW, (int(self.x + 8), int(self.y + 5)), 2)
+        pygame.draw.circle(surface, YELLOW, (int(x - 8), int(y + 5)), 2)
+        pygame.draw.circle(surface, YELLOW, (int(x + 8), int(y + 5)), 2)
         
         # Draw head
-        head_center_y = self.y - 25
-        pygame.draw.circle(screen, SKIN_COLOR, (int(self.x), int(head_center_y)), 15)
+        head_center_y = y - 25
+        pygame.draw.circle(surface, SKIN_COLOR, (int(x), int(head_center_y)), 15)
         
         # Draw cap
-        cap_rect = pygame.Rect(self.x - 18, head_center_y - 15, 36, 12)
-        pygame.draw.rect(screen, RED, cap_rect)
+        cap_rect = pygame.Rect(x - 18, head_center_y - 15, 36, 12)
+        pygame.draw.rect(surface, RED, cap_rect)
         # Cap brim
-        brim_rect = pygame.Rect(self.x - 20, head_center_y - 8, 40, 3)
-        pygame.draw.rect(screen, RED, brim_rect)
+        brim_rect = pygame.Rect(x - 20, head_center_y - 8, 40, 3)
+        pygame.draw.rect(surface, RED, brim_rect)
         
         # Draw 'M' on cap
-        font = pygame.font.Font(None, 16)
-        m_text = font.render("M", True, WHITE)
-        m_rect = m_text.get_rect(center=(self.x, head_center_y - 9))
-        screen.blit(m_text, m_rect)
+        m_text = text_cache.render("M", 16, WHITE)
+        m_rect = m_text.get_rect(center=(x, head_center_y - 9))
+        surface.blit(m_text, m_rect)
         
         # Draw eyes
-        eye_left_x = self.x - 5
-        eye_right_x = self.x + 5
+        eye_left_x = x - 5
+        eye_right_x = x + 5
         eye_y = head_center_y - 2
-        pygame.draw.circle(screen, BLACK, (int(eye_left_x), int(eye_y)), 2)
-        pygame.draw.circle(screen, BLACK, (int(eye_right_x), int(eye_y)), 2)
+        pygame.draw.circle(surface, BLACK, (int(eye_left_x), int(eye_y)), 2)
+        pygame.draw.circle(surface, BLACK, (int(eye_right_x), int(eye_y)), 2)
         
         # Draw mustache
         mustache_points_left = [
-            (self.x - 2, head_center_y + 5),
-            (self.x - 10, head_center_y + 3),
-            (self.x - 12, head_center_y + 5),
-            (self.x - 10, head_center_y + 7),
-            (self.x - 2, head_center_y + 7)
+            (x - 2, head_center_y + 5),
+            (x - 10, head_center_y + 3),
+            (x - 12, head_center_y + 5),
+            (x - 10, head_center_y + 7),
+            (x - 2, head_center_y + 7)
         ]
         mustache_points_right = [
-            (self.x + 2, head_center_y + 5),
-            (self.x + 10, head_center_y + 3),
-            (self.x + 12, head_center_y + 5),
-            (self.x + 10, head_center_y + 7),
-            (self.x + 2, head_center_y + 7)
+            (x + 2, head_center_y + 5),
+            (x + 10, head_center_y + 3),
+            (x + 12, head_center_y + 5),
+            (x + 10, head_center_y + 7),
+            (x + 2, head_center_y + 7)
         ]
-        pygame.draw.polygon(screen, BLACK, mustache_points_left)
-        pygame.draw.polygon(screen, BLACK, mustache_points_right)
+        pygame.draw.polygon(surface, BLACK, mustache_points_left)
+        pygame.draw.polygon(surface, BLACK, mustache_points_right)
         
         # Draw arms (animated when jumping)
         if self.is_jumping:
             # Arms up when jumping
             left_arm_points = [
-                (self.x - 20, self.y - 10),
-                (self.x - 30, self.y - 20),
-                (self.x - 28, self.y - 22),
-                (self.x - 18, self.y - 12)
+                (x - 20, y - 10),
+                (x - 30, y - 20),
+                (x - 28, y - 22),
+                (x - 18, y - 12)
             ]
             right_arm_points = [
-                (self.x + 20, self.y - 10),
-                (self.x + 30, self.y - 20),
-                (self.x + 28, self.y - 22),
-                (self.x + 18, self.y - 12)
+                (x + 20, y - 10),
+                (x + 30, y - 20),
+                (x + 28, y - 22),
+                (x + 18, y - 12)
             ]
         else:
             # Arms down when falling
             left_arm_points = [
-                (self.x - 20, self.y - 5),
-                (self.x - 28, self.y),
-                (self.x - 26, self.y + 2),
-                (self.x - 18, self.y - 3)
+                (x - 20, y - 5),
+                (x - 28, y),
+                (x - 26, y + 2),
+                (x - 18, y - 3)
             ]
             right_arm_points = [
-                (self.x + 20, self.y - 5),
-                (self.x + 28, self.y),
-                (self.x + 26, self.y + 2),
-                (self.x + 18, self.y - 3)
+                (x + 20, y - 5),
+                (x + 28, y),
+                (x + 26, y + 2),
+                (x + 18, y - 3)
             ]
         
-        pygame.draw.polygon(screen, SKIN_COLOR, left_arm_points)
-        pygame.draw.polygon(screen, SKIN_COLOR, right_arm_points)
+        pygame.draw.polygon(surface, SKIN_COLOR, left_arm_points)
+        pygame.draw.polygon(surface, SKIN_COLOR, right_arm_points)
         
         # Draw gloves
         if self.is_jumping:
-            pygame.draw.circle(screen, WHITE, (int(self.x - 29), int(self.y - 21)), 5)
-            pygame.draw.circle(screen, WHITE, (int(self.x + 29), int(self.y - 21)), 5)
+            pygame.draw.circle(surface, WHITE, (int(x - 29), int(y - 21)), 5)
+            pygame.draw.circle(surface, WHITE, (int(x + 29), int(y - 21)), 5)
         else:
-            pygame.draw.circle(screen, WHITE, (int(self.x - 27), int(self.y + 1)), 5)
-            pygame.draw.circle(screen, WHITE, (int(self.x + 27), int(self.y + 1)), 5)
+            pygame.draw.circle(surface, WHITE, (int(x - 27), int(y + 1)), 5)
+            pygame.draw.circle(surface, WHITE, (int(x + 27), int(y + 1)), 5)
         
         # Draw shoes
-        shoe_left_rect = pygame.Rect(self.x - 18, self.y + 13, 15, 7)
-        shoe_right_rect = pygame.Rect(self.x + 3, self.y + 13, 15, 7)
-        pygame.draw.rect(screen, BROWN, shoe_left_rect)
-        pygame.draw.rect(screen, BROWN, shoe_right_rect)
+        shoe_left_rect = pygame.Rect(x - 18, y + 13, 15, 7)
+        shoe_right_rect = pygame.Rect(x + 3, y + 13, 15, 7)
+        pygame.draw.rect(surface, BROWN, shoe_left_rect)
+        pygame.draw.rect(surface, BROWN, shoe_right_rect)
+
+# Contrail tuning: frames between smoke puffs and opacity lost per frame
+CONTRAIL_INTERVAL = 3
+CONTRAIL_FADE = 3
+CONTRAIL_MAX_ALPHA = 100
+
+# Pre-baked white smoke puffs, indexed by alpha (0..CONTRAIL_MAX_ALPHA)
+_smoke_sprites = []
+
+def get_smoke_sprites():
+    if not _smoke_sprites:
+        for alpha in range(CONTRAIL_MAX_ALPHA + 1):
+            sprite = pygame.Surface((20, 20), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (255, 255, 255, alpha), (10, 10), 10)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            _smoke_sprites.append(sprite)
+    return _smoke_sprites
+
+class ContrailParticles:
+    """Fixed-capacity ring buffer of smoke puffs stored in NumPy arrays.
+
+    Puffs are emitted in order with the same opacity and all fade at the
+    same rate, so the oldest puff is always the first to die and expiry is
+    just advancing the head of the ring.
+    """
+    def __init__(self, capacity=255 // CONTRAIL_FADE // CONTRAIL_INTERVAL + 1):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.opacity = np.zeros(capacity, dtype=np.int32)
+        self.head = 0  # Index of the oldest live puff
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, opacity=255):
+        if self.count == self.capacity:
+            # Full: overwrite the oldest puff
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+        i = (self.head + self.count) % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.opacity[i] = opacity
+        self.count += 1
+
+    def update(self):
+        self.opacity -= CONTRAIL_FADE
+        while self.count and self.opacity[self.head] <= 0:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+
+    def draw(self, screen):
+        """Draw all live puffs; returns their bounding rect, or None if empty"""
+        if not self.count:
+            return None
+        live = (self.head + np.arange(self.count)) % self.capacity
+        alphas = np.minimum(self.opacity[live], CONTRAIL_MAX_ALPHA).tolist()
+        left = self.x[live] - 10
+        top = self.y[live] - 10
+        sprites = get_smoke_sprites()
+        screen.blits([(sprites[alpha], (x, y))
+                      for alpha, x, y in zip(alphas, left.tolist(), top.tolist())],
+                     doreturn=False)
+        return pygame.Rect(int(left.min()), int(top.min()),
+                           int(left.max() - left.min()) + 20, int(top.max() - top.min()) + 20)
 
 class JetPlane:
     def __init__(self, x, y, direction):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position at the start of the current tick
+        self.prev_y = y
         self.direction = direction  # 1 for right, -1 for left
         self.speed = 2 if direction == 1 else -2
-        self.contrail = []  # List of smoke trail positions
+        self.contrail = ContrailParticles()  # Smoke trail puffs
         self.contrail_timer = 0
         self.banner_offset = 0  # For banner wave animation
         self.banner_wave_timer = 0
@@ -270,38 +530,36 @@ class JetPlane:
         
         # Add to contrail
         self.contrail_timer += 1
-        if self.contrail_timer >= 3:
+        if self.contrail_timer >= CONTRAIL_INTERVAL:
             if self.direction == 1:
-                self.contrail.append({'x': self.x - 35, 'y': self.y, 'opacity': 255})
+                self.contrail.emit(self.x - 35, self.y)
             else:
-                self.contrail.append({'x': self.x + 35, 'y': self.y, 'opacity': 255})
+                self.contrail.emit(self.x + 35, self.y)
             self.contrail_timer = 0
         
         # Update contrail (fade out and remove old particles)
-        for particle in self.contrail[:]:
-            particle['opacity'] -= 3
-            if particle['opacity'] <= 0:
-                self.contrail.remove(particle)
+        self.contrail.update()
+
+    def save_position(self):
+        self.prev_x, self.prev_y = self.x, self.y
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Draw contrail first (behind the plane)
-        for particle in self.contrail:
-            alpha = particle['opacity']
-            if alpha > 0:
-                # Draw white smoke circles with transparency
-                smoke_surface = pygame.Surface((20, 20), pygame.SRCALPHA)
-                pygame.draw.circle(smoke_surface, (255, 255, 255, min(alpha, 100)), (10, 10), 10)
-                screen.blit(smoke_surface, (particle['x'] - 10, particle['y'] - 10))
+        contrail_rect = self.contrail.draw(screen)
+
+        # Interpolate between the last two tick positions
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
         
         # Draw cable/rope connecting plane to banner
         if self.direction == 1:  # Flying right
-            cable_start = (self.x - 35, self.y)
-            banner_x = self.x - 120
+            cable_start = (x - 35, y)
+            banner_x = x - 120
         else:  # Flying left
-            cable_start = (self.x + 35, self.y)
-            banner_x = self.x + 60
+            cable_start = (x + 35, y)
+            banner_x = x + 60
         
-        banner_y = self.y + 5 + self.banner_offset
+        banner_y = y + 5 + self.banner_offset
         cable_end = (banner_x + 60, banner_y)
         
         # Draw cable as multiple thin lines for rope effect
@@ -328,241 +586,1070 @@ class JetPlane:
         pygame.draw.polygon(screen, WHITE, banner_points, 2)
         
         # Draw banner text
-        font = pygame.font.Font(None, 20)
-        text = font.render("Welcome Tambay", True, WHITE)
+        text = text_cache.render("Welcome Tambay", 20, WHITE)
         text_rect = text.get_rect(center=(banner_x + banner_width // 2, banner_y))
         screen.blit(text, text_rect)
         
         # Draw jet plane
         if self.direction == 1:  # Flying right
             # Fuselage
-            pygame.draw.ellipse(screen, GRAY, (self.x - 30, self.y - 8, 60, 16))
-            pygame.draw.ellipse(screen, DARK_GRAY, (self.x - 30, self.y - 8, 60, 16), 2)
+            pygame.draw.ellipse(screen, GRAY, (x - 30, y - 8, 60, 16))
+            pygame.draw.ellipse(screen, DARK_GRAY, (x - 30, y - 8, 60, 16), 2)
             
             # Cockpit
-            pygame.draw.ellipse(screen, LIGHT_GRAY, (self.x + 15, self.y - 6, 15, 12))
-            pygame.draw.ellipse(screen, BLACK, (self.x + 20, self.y - 4, 8, 8))
+            pygame.draw.ellipse(screen, LIGHT_GRAY, (x + 15, y - 6, 15, 12))
+            pygame.draw.ellipse(screen, BLACK, (x + 20, y - 4, 8, 8))
             
             # Wings
             wing_points = [
-                (self.x - 5, self.y),
-                (self.x - 20, self.y - 15),
-                (self.x - 15, self.y - 15),
-                (self.x + 5, self.y)
+                (x - 5, y),
+                (x - 20, y - 15),
+                (x - 15, y - 15),
+                (x + 5, y)
             ]
             pygame.draw.polygon(screen, GRAY, wing_points)
             pygame.draw.polygon(screen, DARK_GRAY, wing_points, 2)
             
             wing_points2 = [
-                (self.x - 5, self.y),
-                (self.x - 20, self.y + 15),
-                (self.x - 15, self.y + 15),
-                (self.x + 5, self.y)
+                (x - 5, y),
+                (x - 20, y + 15),
+                (x - 15, y + 15),
+                (x + 5, y)
             ]
             pygame.draw.polygon(screen, GRAY, wing_points2)
             pygame.draw.polygon(screen, DARK_GRAY, wing_points2, 2)
             
             # Tail
             tail_points = [
-                (self.x - 25, self.y),
-                (self.x - 35, self.y - 10),
-                (self.x - 30, self.y - 10),
-                (self.x - 20, self.y)
+                (x - 25, y),
+                (x - 35, y - 10),
+                (x - 30, y - 10),
+                (x - 20, y)
             ]
             pygame.draw.polygon(screen, GRAY, tail_points)
             pygame.draw.polygon(screen, DARK_GRAY, tail_points, 2)
             
             # Engine
-            pygame.draw.circle(screen, DARK_GRAY, (int(self.x - 30), int(self.y)), 5)
-            pygame.draw.circle(screen, RED, (int(self.x - 32), int(self.y)), 3)
+            pygame.draw.circle(screen, DARK_GRAY, (int(x - 30), int(y)), 5)
+            pygame.draw.circle(screen, RED, (int(x - 32), int(y)), 3)
             
         else:  # Flying left
             # Fuselage
-            pygame.draw.ellipse(screen, GRAY, (self.x - 30, self.y - 8, 60, 16))
-            pygame.draw.ellipse(screen, DARK_GRAY, (self.x - 30, self.y - 8, 60, 16), 2)
+            pygame.draw.ellipse(screen, GRAY, (x - 30, y - 8, 60, 16))
+            pygame.draw.ellipse(screen, DARK_GRAY, (x - 30, y - 8, 60, 16), 2)
             
             # Cockpit
-            pygame.draw.ellipse(screen, LIGHT_GRAY, (self.x - 30, self.y - 6, 15, 12))
-            pygame.draw.ellipse(screen, BLACK, (self.x - 28, self.y - 4, 8, 8))
+            pygame.draw.ellipse(screen, LIGHT_GRAY, (x - 30, y - 6, 15, 12))
+            pygame.draw.ellipse(screen, BLACK, (x - 28, y - 4, 8, 8))
             
             # Wings
             wing_points = [
-                (self.x + 5, self.y),
-                (self.x + 20, self.y - 15),
-                (self.x + 15, self.y - 15),
-                (self.x - 5, self.y)
+                (x + 5, y),
+                (x + 20, y - 15),
+                (x + 15, y - 15),
+                (x - 5, y)
             ]
             pygame.draw.polygon(screen, GRAY, wing_points)
             pygame.draw.polygon(screen, DARK_GRAY, wing_points, 2)
             
             wing_points2 = [
-                (self.x + 5, self.y),
-                (self.x + 20, self.y + 15),
-                (self.x + 15, self.y + 15),
-                (self.x - 5, self.y)
+                (x + 5, y),
+                (x + 20, y + 15),
+                (x + 15, y + 15),
+                (x - 5, y)
             ]
             pygame.draw.polygon(screen, GRAY, wing_points2)
             pygame.draw.polygon(screen, DARK_GRAY, wing_points2, 2)
             
             # Tail
             tail_points = [
-                (self.x + 25, self.y),
-                (self.x + 35, self.y - 10),
-                (self.x + 30, self.y - 10),
-                (self.x + 20, self.y)
+                (x + 25, y),
+                (x + 35, y - 10),
+                (x + 30, y - 10),
+                (x + 20, y)
             ]
             pygame.draw.polygon(screen, GRAY, tail_points)
             pygame.draw.polygon(screen, DARK_GRAY, tail_points, 2)
             
             # Engine
-            pygame.draw.circle(screen, DARK_GRAY, (int(self.x + 30), int(self.y)), 5)
-            pygame.draw.circle(screen, RED, (int(self.x + 32), int(self.y)), 3)
+            pygame.draw.circle(screen, DARK_GRAY, (int(x + 30), int(y)), 5)
+            pygame.draw.circle(screen, RED, (int(x + 32), int(y)), 3)
+
+        # Everything drawn this frame, padded for outlines and the banner wave
+        left = min(x - 40, banner_x - 2)
+        right = max(x + 40, banner_x + banner_width + 2)
+        top = min(y - 18, banner_y - banner_height // 2 - 5)
+        bottom = max(y + 18, banner_y + banner_height // 2 + 5)
+        bounds = pygame.Rect(int(left), int(top), int(right - left) + 1, int(bottom - top) + 1)
+        if contrail_rect is not None:
+            bounds.union_ip(contrail_rect)
+        return bounds
     
     def is_off_screen(self):
         return self.x < -100 or self.x > SCREEN_WIDTH + 100
 
 class Pipe:
-    def __init__(self, x):
+    def __init__(self, x, rng=random, height=None):
+        if height is None:
+            height = rng.randint(*PIPE_HEIGHTS)
+        self.top_rect = pygame.Rect(0, 0, PIPE_WIDTH, 0)
+        self.bottom_rect = pygame.Rect(0, 0, PIPE_WIDTH, 0)
+        self.reset(x, height)
+
+    def reset(self, x, height):
+        """Reuse this pipe for a new spawn, updating its cached collision rects"""
         self.x = x
-        self.height = random.randint(100, SCREEN_HEIGHT - GROUND_HEIGHT - PIPE_GAP - 100)
+        self.prev_x = x  # Position at the start of the current tick
+        self.height = height
         self.passed = False
+        self.top_rect.x = x
+        self.top_rect.height = height
+        self.bottom_rect.x = x
+        self.bottom_rect.y = height + PIPE_GAP
+        self.bottom_rect.height = SCREEN_HEIGHT - height - PIPE_GAP - GROUND_HEIGHT
         
-    def update(self):
-        self.x -= PIPE_SPEED
+    def update(self, frames=1):
+        self.x -= PIPE_SPEED * frames
+        self.top_rect.x = self.x
+        self.bottom_rect.x = self.x
+
+    def save_position(self):
+        self.prev_x = self.x
         
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
+        x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+
         # Top pipe
-        pygame.draw.rect(screen, DARK_GREEN, 
-                        (self.x, 0, PIPE_WIDTH, self.height))
-        pygame.draw.rect(screen, GREEN, 
-                        (self.x - 5, self.height - 30, PIPE_WIDTH + 10, 30))
+        top_rect = pygame.draw.rect(screen, DARK_GREEN, 
+                                    (x, 0, PIPE_WIDTH, self.height))
+        top_cap_rect = pygame.draw.rect(screen, GREEN, 
+                                        (x - 5, self.height - 30, PIPE_WIDTH + 10, 30))
         
         # Bottom pipe
         bottom_pipe_y = self.height + PIPE_GAP
-        pygame.draw.rect(screen, DARK_GREEN, 
-                        (self.x, bottom_pipe_y, PIPE_WIDTH, 
-                         SCREEN_HEIGHT - bottom_pipe_y - GROUND_HEIGHT))
+        bottom_rect = pygame.draw.rect(screen, DARK_GREEN, 
+                                       (x, bottom_pipe_y, PIPE_WIDTH, 
+                                        SCREEN_HEIGHT - bottom_pipe_y - GROUND_HEIGHT))
         pygame.draw.rect(screen, GREEN, 
-                        (self.x - 5, bottom_pipe_y, PIPE_WIDTH + 10, 30))
+                        (x - 5, bottom_pipe_y, PIPE_WIDTH + 10, 30))
+        return top_rect.union(top_cap_rect), bottom_rect.inflate(10, 0)
         
     def get_rects(self):
-        top_rect = pygame.Rect(self.x, 0, PIPE_WIDTH, self.height)
-        bottom_rect = pygame.Rect(self.x, self.height + PIPE_GAP, PIPE_WIDTH, 
-                                 SCREEN_HEIGHT - self.height - PIPE_GAP - GROUND_HEIGHT)
-        return top_rect, bottom_rect
+        """Cached (top, bottom) collision rects; treat them as read-only"""
+        return self.top_rect, self.bottom_rect
     
     def is_off_screen(self):
         return self.x + PIPE_WIDTH < 0
 
+class PipePool:
+    """Ring buffer of recycled Pipe objects, ordered oldest (leftmost) first.
+
+    Pipes spawn at the right edge and all move at the same speed, so the
+    live ones are always sorted by x and only the oldest can leave the
+    screen. That makes removal a head advance and lets collision look up
+    just the pipes overlapping a given x-range by binary search.
+    """
+    def __init__(self, capacity=MAX_PIPES):
+        self.slots = [Pipe(SCREEN_WIDTH, height=100) for _ in range(capacity)]
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("pipe index out of range")
+        return self.slots[(self.head + i) % len(self.slots)]
+
+    def __iter__(self):
+        slots = self.slots
+        capacity = len(slots)
+        for i in range(self.head, self.head + self.count):
+            yield slots[i % capacity]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def spawn(self, x, height):
+        if self.count == len(self.slots):
+            # Grow, keeping live pipes in order at the front
+            self.slots = list(self) + [Pipe(x, height=height) for _ in range(len(self.slots))]
+            self.head = 0
+        pipe = self.slots[(self.head + self.count) % len(self.slots)]
+        pipe.reset(x, height)
+        self.count += 1
+        return pipe
+
+    def remove_off_screen(self):
+        while self.count and self.slots[self.head].is_off_screen():
+            self.head = (self.head + 1) % len(self.slots)
+            self.count -= 1
+
+    def overlapping(self, left, right):
+        """Yield the live pipes whose span overlaps the open x-range (left, right)"""
+        # Binary search for the first pipe that ends right of `left`
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self[mid].x + PIPE_WIDTH > left:
+                high = mid
+            else:
+                low = mid + 1
+        for i in range(low, self.count):
+            pipe = self[i]
+            if pipe.x >= right:
+                break
+            yield pipe
+
+# Playable characters by selection name
+CHARACTERS = {"bird": Bird, "mario": Mario}
+
+def path_crossings(y, velocity, level):
+    """Times t at which the no-flap path y + velocity*t + GRAVITY*t*(t+1)/2,
+    exact at whole frames, meets level; (first, last) or None if never"""
+    a = GRAVITY / 2
+    b = velocity + GRAVITY / 2
+    discriminant = b * b - 4 * a * (y - level)
+    if discriminant < 0:
+        return None
+    root = math.sqrt(discriminant)
+    return (-b - root) / (2 * a), (-b + root) / (2 * a)
+
+def first_time_beyond(y, velocity, level, below, start, stop, strict=False):
+    """Earliest t in [start, stop] where the no-flap path reaches level from
+    above (below=True) or from below; None if it stays on its side.
+
+    With strict=True the path must then stay past level for some time
+    before stop, so only touching level (or the window's end) does not count.
+    """
+    crossings = path_crossings(y, velocity, level)
+    if below:
+        # The parabola opens upwards: it is under level only between crossings
+        if crossings is None or crossings[1] < start:
+            return None
+        t = max(start, crossings[0])
+        end = crossings[1]
+    elif crossings is None or start >= crossings[1] or (
+            start < crossings[0] if strict else start <= crossings[0]):
+        t = start
+        end = crossings[0] if crossings is not None and start < crossings[0] else math.inf
+    else:
+        t = crossings[1]
+        end = math.inf
+    if strict:
+        return t if t < min(stop, end) else None
+    return t if t <= stop else None
+
+# Default course source: pipe heights drawn lazily from each run's seed
+SEEDED_COURSES = SeededCourses(*PIPE_HEIGHTS)
+
+class FlappyEngine:
+    """Display-free simulation core.
+
+    Drives the character, pipe spawning and collision one frame per step()
+    without creating a window or fonts, so bots and regression checks can
+    run as fast as the interpreter allows. Pipe heights come from a course
+    source (see flappy_course), so a seed reproduces the whole course.
+
+    With swept=True collisions are continuous: the character's parabolic
+    path is tested against each pipe's moving box between frames, so
+    nothing tunnels through a pipe however fast it moves.
+    """
+    def __init__(self, character="bird", seed=None, swept=False, courses=None):
+        self.character_name = character
+        self.swept = swept
+        self.courses = courses or SEEDED_COURSES
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.course = self.courses.heights(seed)
+        self.character = CHARACTERS[self.character_name](CHARACTER_X, SCREEN_HEIGHT // 2)
+        if not hasattr(self, "pipes"):
+            self.pipes = PipePool()
+        self.pipes.clear()
+        self.pipe_timer = 0
+        self.score = 0
+        self.frame = 0
+        self.done = False
+        self.death_cause = None  # "ceiling", "ground", "top_pipe" or "bottom_pipe"
+
+    def step(self, action=False):
+        """Advance one frame, flapping first if action is truthy. Returns done."""
+        if self.done:
+            return True
+        if action:
+            self.character.jump()
+        if self.swept:
+            self.advance_span(1)
+            return self.done
+
+        # Update character
+        self.character.update()
+        self.frame += 1
+
+        # Check boundaries
+        if self.character.y <= 0:
+            self.done = True
+            self.death_cause = "ceiling"
+        elif self.character.y >= SCREEN_HEIGHT - GROUND_HEIGHT:
+            self.done = True
+            self.death_cause = "ground"
+
+        # Spawn pipes
+        self.pipe_timer += 1
+        if self.pipe_timer >= PIPE_INTERVAL:  # Spawn pipe every 1.5 seconds
+            self.pipes.spawn(SCREEN_WIDTH, next(self.course))
+            self.pipe_timer = 0
+
+        # Update pipes and check if character passed them
+        character_x = self.character.x
+        for pipe in self.pipes:
+            pipe.update()
+            if not pipe.passed and pipe.x + PIPE_WIDTH < character_x:
+                pipe.passed = True
+                self.score += 1
+
+        # Check collision against the pipes overlapping the character only
+        character_rect = self.character.get_rect()
+        for pipe in self.pipes.overlapping(character_rect.left, character_rect.right):
+            if character_rect.colliderect(pipe.top_rect):
+                cause = "top_pipe"
+            elif character_rect.colliderect(pipe.bottom_rect):
+                cause = "bottom_pipe"
+            else:
+                continue
+            if not self.done:
+                self.death_cause = cause
+            self.done = True
+            break
+
+        # Remove off-screen pipes
+        self.pipes.remove_off_screen()
+
+        return self.done
+
+    def advance(self, frames):
+        """Advance up to `frames` frames without flapping in one call. Returns done.
+
+        The character's path is a parabola and pipes move linearly, so each
+        stretch between pipe spawns costs one time-of-impact solve per pipe
+        instead of a step per frame. Unless swept, the result matches
+        `frames` calls to step(False).
+        """
+        while frames > 0 and not self.done:
+            span = min(frames, PIPE_INTERVAL - self.pipe_timer)
+            self.advance_span(span)
+            frames -= span
+        return self.done
+
+    def advance_span(self, frames):
+        """Advance `frames` frames with no flap and no pipe spawn before the last"""
+        character = self.character
+        y, velocity = character.y, character.velocity
+        size = character.size
+        left, right = character.x - size, character.x + size
+        ground = SCREEN_HEIGHT - GROUND_HEIGHT
+        # The character's Rect truncates its top edge, so it reaches the
+        # bottom pipe one pixel lower; swept mode uses the same box
+        bottom_margin = size - 1
+
+        # Earliest contact as (frame, priority, cause); the priority breaks
+        # ties in the order step() checks boundaries, pipes, top then bottom
+        contacts = []
+        for level, below, cause in ((0, True, "ceiling"), (ground, False, "ground")):
+            t = first_time_beyond(y, velocity, level, below, 0, frames)
+            frame = None if t is None else self.contact_frame(t, cause)
+            if frame is not None and frame <= frames:
+                contacts.append((frame, 0, cause))
+        for order, pipe in enumerate(self.pipes):
+            # The boxes overlap horizontally while left < pipe x + width and
+            # pipe x < right, an open interval: touching edges is no overlap.
+            # Swept contacts need the real exit time to tell touch from overlap.
+            start = max(0, (pipe.x - right) / PIPE_SPEED)
+            stop = (pipe.x + PIPE_WIDTH - left) / PIPE_SPEED
+            if not self.swept:
+                stop = min(frames, stop)
+            if start >= stop:
+                continue
+            for level, below, cause in ((pipe.height + size, True, "top_pipe"),
+                                        (pipe.height + PIPE_GAP - bottom_margin, False, "bottom_pipe")):
+                t = first_time_beyond(y, velocity, level, below, start, stop, strict=self.swept)
+                if t is None:
+                    continue
+                frame = self.contact_frame(t, cause, pipe, start)
+                if frame is not None and frame <= frames:
+                    contacts.append((frame, 1 + order, cause))
+        contact = min(contacts) if contacts else None
+        if contact:
+            frames = contact[0]
+
+        character.advance(frames)
+        self.frame += frames
+        self.pipe_timer += frames
+        character_x = character.x
+        for pipe in self.pipes:
+            pipe.update(frames)
+            if not pipe.passed and pipe.x + PIPE_WIDTH < character_x:
+                pipe.passed = True
+                self.score += 1
+        if self.pipe_timer >= PIPE_INTERVAL:
+            # Spawned on the last frame, so it has moved once
+            self.pipes.spawn(SCREEN_WIDTH, next(self.course)).update()
+            self.pipe_timer = 0
+        self.pipes.remove_off_screen()
+
+        if contact:
+            self.done = True
+            self.death_cause = contact[2]
+
+    def contact_frame(self, t, cause, pipe=None, entered=0):
+        """Frame at which a contact first found at time t ends the game.
+
+        Swept contact counts the first frame whose motion, end included,
+        really overlapped. The ceiling, the ground and the truncated Rect's
+        reach into the bottom pipe count from t itself, as in step(); the
+        top pipe and a pipe's leading edge (t == entered) only just after t.
+        Otherwise the contact must show at a whole frame the way step() sees
+        it, with pygame.Rect truncation, so the frames around t are checked
+        exactly.
+        """
+        if self.swept:
+            if pipe is None or (cause == "bottom_pipe" and t > entered):
+                return max(1, math.ceil(t))
+            return math.floor(t) + 1
+        for frame in range(max(1, math.floor(t)), math.floor(t) + 3):
+            if self.hit_at(frame, cause, pipe):
+                return frame
+        return None
+
+    def hit_at(self, frame, cause, pipe=None):
+        """Would step() see this contact `frame` frames from now, flapping never?"""
+        character = self.character
+        y = character.y + frame * character.velocity + GRAVITY * frame * (frame + 1) / 2
+        if cause == "ceiling":
+            return y <= 0
+        if cause == "ground":
+            return y >= SCREEN_HEIGHT - GROUND_HEIGHT
+        x = pipe.x - PIPE_SPEED * frame
+        rect = pygame.Rect(character.x - character.size, y - character.size,
+                           character.size * 2, character.size * 2)
+        if cause == "top_pipe":
+            return rect.colliderect((x, 0, PIPE_WIDTH, pipe.height))
+        return rect.colliderect(pipe.bottom_rect.move(x - pipe.x, 0))
+
+def simulate_replay(replay):
+    """Re-run a recorded game headlessly at full speed; returns the engine"""
+    engine = FlappyEngine(replay.character, replay.seed)
+    for flap in replay.inputs():
+        if engine.step(flap):
+            break
+    return engine
+
+def verify_replay(replay):
+    """Check the inputs reproduce the claimed score and end exactly on death.
+
+    Returns (valid, engine) so callers can report what actually happened.
+    """
+    engine = simulate_replay(replay)
+    valid = engine.done and engine.frame == replay.frames and engine.score == replay.score
+    return valid, engine
+
+class FlockEngine:
+    """Many characters flying one shared pipe course, held in NumPy arrays.
+
+    Every character follows FlappyEngine's rules exactly, and a seed gives
+    the same course, but physics is vectorized over an index of the live
+    characters only, so the dead drop out for free. Everyone shares one x
+    position, so the pipes overlapping it are looked up once per frame.
+    """
+    def __init__(self, characters, seed=None, courses=None):
+        self.names = list(characters)
+        self.count = len(self.names)
+        self.kinds = sorted(set(self.names))
+        self.kind = np.array([self.kinds.index(name) for name in self.names], dtype=np.int64)
+        # One character per kind to read geometry from and render sprites with
+        self.prototypes = [CHARACTERS[name](CHARACTER_X, SCREEN_HEIGHT // 2) for name in self.kinds]
+        self.x = self.prototypes[0].x if self.prototypes else CHARACTER_X
+        self.size = self.prototypes[0].size if self.prototypes else CHARACTER_SIZE
+        self.courses = courses or SEEDED_COURSES
+        self.pipes = PipePool()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.course = self.courses.heights(seed)
+        n = self.count
+        self.y = np.full(n, SCREEN_HEIGHT // 2, dtype=np.float64)
+        self.prev_y = self.y.copy()  # Position at the start of the current tick
+        self.velocity = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.death_frame = np.zeros(n, dtype=np.int64)  # 0 while alive
+        self.flap_frame = np.full(n, -100, dtype=np.int64)  # For Mario's raised arms
+        self.live = np.arange(n)  # Indices of the characters still flying
+        self.pipes.clear()
+        self.pipe_timer = 0
+        self.frame = 0
+        self.done = n == 0
+
+    @property
+    def alive(self):
+        return len(self.live)
+
+    def save_positions(self):
+        self.prev_y[self.live] = self.y[self.live]
+        for pipe in self.pipes:
+            pipe.save_position()
+
+    def next_gap_top(self):
+        """Top of the gap in the first pipe not yet behind the characters"""
+        for pipe in self.pipes:
+            if pipe.x + PIPE_WIDTH >= self.x - self.size:
+                return pipe.height
+        return (SCREEN_HEIGHT - GROUND_HEIGHT - PIPE_GAP) // 2
+
+    def step(self, actions):
+        """Advance one frame; actions holds a flap flag per character. Returns done."""
+        if self.done:
+            return True
+        live = self.live
+        flap = live[np.asarray(actions, dtype=bool)[live]]
+        self.velocity[flap] = JUMP_STRENGTH
+        self.flap_frame[flap] = self.frame + 1
+
+        # Update characters
+        velocity = self.velocity[live] + GRAVITY
+        y = self.y[live] + velocity
+        self.velocity[live] = velocity
+        self.y[live] = y
+        self.frame += 1
+
+        # Check boundaries
+        dead = (y <= 0) | (y >= SCREEN_HEIGHT - GROUND_HEIGHT)
+
+        # Spawn pipes
+        self.pipe_timer += 1
+        if self.pipe_timer >= PIPE_INTERVAL:
+            self.pipes.spawn(SCREEN_WIDTH, next(self.course))
+            self.pipe_timer = 0
+
+        # Update pipes; everyone flying this frame passes a pipe together
+        for pipe in self.pipes:
+            pipe.update()
+            if not pipe.passed and pipe.x + PIPE_WIDTH < self.x:
+                pipe.passed = True
+                self.score[live] += 1
+
+        # Check collision like pygame.Rect.colliderect on the truncated top edge
+        top = np.trunc(y - self.size)
+        for pipe in self.pipes.overlapping(self.x - self.size, self.x + self.size):
+            dead |= (top < pipe.height) | (top + self.size * 2 > pipe.height + PIPE_GAP)
+
+        # Remove off-screen pipes
+        self.pipes.remove_off_screen()
+
+        if dead.any():
+            self.death_frame[live[dead]] = self.frame
+            self.live = live[~dead]
+            self.done = not len(self.live)
+        return self.done
+
+class CrowdPilot:
+    """Demo population policy: each character flaps at its own depth below the next gap"""
+    def __init__(self, count, seed=None):
+        self.margin = np.random.default_rng(seed).uniform(90, 150, count)
+
+    def __call__(self, flock):
+        return (flock.y > flock.next_gap_top() + self.margin) & (flock.velocity > 0)
+
+class GhostPilot:
+    """Replays the recorded inputs of several runs side by side"""
+    def __init__(self, replays):
+        frames = max((replay.frames for replay in replays), default=0)
+        self.inputs = np.zeros((len(replays), frames + 1), dtype=bool)
+        for i, replay in enumerate(replays):
+            bits = np.unpackbits(np.frombuffer(bytes(replay.bits), dtype=np.uint8),
+                                 bitorder="little")
+            self.inputs[i, :replay.frames] = bits[:replay.frames]
+
+    def __call__(self, flock):
+        return self.inputs[:, min(flock.frame, self.inputs.shape[1] - 1)]
+
+# Autopilot lookahead: frames planned ahead (long enough to see a pipe from
+# the moment it spawns) and CPU time allowed per decision
+AUTOPILOT_HORIZON = 90
+AUTOPILOT_BUDGET = 0.002  # Seconds
+ATTRACT_RESTART_DELAY = 120  # Ticks the game-over screen stays up in attract mode
+
+# Trajectory tables: height change k frames after a flap, and k frames of
+# gravity alone (add k * velocity for a fall from a moving start)
+FLAP_DY = [k * JUMP_STRENGTH + GRAVITY * k * (k + 1) / 2 for k in range(AUTOPILOT_HORIZON + 1)]
+FALL_DY = [GRAVITY * k * (k + 1) / 2 for k in range(AUTOPILOT_HORIZON + 1)]
+# Flapping this far below a target height centres the flap's arc on it
+FLAP_AIM = -min(FLAP_DY) / 2
+
+class _PlanTimeout(Exception):
+    pass
+
+class Autopilot:
+    """Lookahead bot: flaps only when no flap-free future survives the horizon.
+
+    Each decision turns the pipes on screen into a safe height band per
+    future frame and searches flap schedules against those bands, reading
+    positions from the trajectory tables instead of re-simulating. A flap
+    resets velocity, so the state after one depends only on (frame, y);
+    dead ends stay memoised until a new pipe appears, and the surviving
+    schedule is kept and simply followed while it still clears the horizon.
+    When the budget runs out the action that survived longest so far wins.
+    Instances are policies: call one with a FlappyEngine.
+    """
+    def __init__(self, horizon=AUTOPILOT_HORIZON, budget=AUTOPILOT_BUDGET):
+        self.horizon = min(horizon, AUTOPILOT_HORIZON)
+        self.budget = budget
+        self.timeouts = 0  # Decisions cut short by the budget
+        self.course = None
+        self.start = 0
+        self.plan = set()  # Frames to flap on
+        self.dead = {}  # Frame flapped on -> {y flapped from: last frame survived}
+        # Per-decision search state, set up by decide()
+        self.end = 0  # Horizon frame
+        self.deadline = 0.0
+        self.memo = {}  # (frame, y) flapped from -> (last frame reached, next flap)
+        self.low = []  # Safe heights, target heights per future frame (plan_bands)
+        self.high = []
+        self.target = []
+
+    def __call__(self, engine):
+        return self.decide(engine)
+
+    def decide(self, engine):
+        """Return whether to flap this frame"""
+        frame = engine.frame
+        character = engine.character
+        y, velocity = character.y, character.velocity
+
+        # New pipes only narrow the safe bands, so dead ends stay dead for
+        # the whole course; forget the ones already behind us
+        course = (id(engine), engine.seed)
+        if course != self.course or frame < self.start:
+            self.course = course
+            self.dead = {}
+            self.plan = set()
+        for t in [t for t in self.dead if t < frame]:
+            del self.dead[t]
+        self.start = frame
+        self.end = frame + self.horizon
+        self.plan_bands(engine)
+        if self.follow(y, velocity) == self.end:
+            return frame in self.plan
+
+        # Look for the first surviving schedule, trying the flap closest to
+        # the target first; flapping now is just the earliest candidate
+        self.deadline = time.perf_counter() + self.budget
+        self.memo = {}
+        best = (self.fall(frame, y, velocity), None)
+        if best[0] < self.end:
+            flap_now = self.fall(frame, y, JUMP_STRENGTH)
+            if flap_now > best[0]:
+                best = (flap_now, (frame, y))
+            flaps = [(frame, y)] + [(frame + w, y + w * velocity + FALL_DY[w])
+                                    for w in range(1, best[0] - frame + 1)]
+            try:
+                best = self.best_flap(flaps, best)
+            except _PlanTimeout as timeout:
+                self.timeouts += 1
+                best = timeout.best
+
+        self.plan = set()
+        key = best[1]
+        while key is not None:
+            self.plan.add(key[0])
+            key = self.memo.get(key, (0, None))[1]
+        return frame in self.plan
+
+    def plan_bands(self, engine):
+        """Safe heights low <= y < high and a target height for each future frame"""
+        character = engine.character
+        size = character.size
+        left, right = character.x - size, character.x + size
+        horizon = self.horizon
+        self.low = [1e-9] * (horizon + 1)  # The ceiling kills at y <= 0
+        self.high = [SCREEN_HEIGHT - GROUND_HEIGHT] * (horizon + 1)
+        self.target = [(SCREEN_HEIGHT - GROUND_HEIGHT) / 2] * (horizon + 1)
+        # Oldest last, so each frame ends up aiming at the nearest pipe ahead
+        for pipe in reversed(list(engine.pipes)):
+            # pygame.Rect truncates the character's top edge; heights are whole
+            safe_low = pipe.height + size
+            safe_high = pipe.height + PIPE_GAP - size + 1
+            centre = pipe.height + PIPE_GAP / 2
+            for t in range(horizon + 1):
+                x = pipe.x - PIPE_SPEED * t
+                if x + PIPE_WIDTH <= left:
+                    break
+                self.target[t] = centre
+                if x < right:
+                    self.low[t] = max(self.low[t], safe_low)
+                    self.high[t] = min(self.high[t], safe_high)
+
+    def follow(self, y, velocity):
+        """Last frame reached by flying the current plan"""
+        low, high, start = self.low, self.high, self.start
+        for t in range(start, self.end):
+            if t in self.plan:
+                velocity = JUMP_STRENGTH
+            velocity += GRAVITY
+            y += velocity
+            if not low[t + 1 - start] <= y < high[t + 1 - start]:
+                return t
+        return self.end
+
+    def fall(self, t, y, velocity):
+        """Last frame reached without flapping from frame t on"""
+        low, high = self.low, self.high
+        offset = t - self.start
+        for k in range(1, self.end - t + 1):
+            height = y + k * velocity + FALL_DY[k]
+            if not low[offset + k] <= height < high[offset + k]:
+                return t + k - 1
+        return self.end
+
+    def by_target(self, flaps):
+        """(frame, y) flap states, those whose arc centres on the target first"""
+        target, start = self.target, self.start
+        return sorted(flaps, key=lambda flap: abs(flap[1] - FLAP_AIM - target[flap[0] - start]))
+
+    def best_flap(self, flaps, best=(0, None)):
+        """(furthest frame reached, state) over flapping from any (frame, y) state.
+
+        Improves on `best`. On a budget timeout the exception carries the
+        best found so far as .best; the outermost call sets it last.
+        """
+        try:
+            for key in self.by_target(flaps):
+                reached = self.after_flap(*key)
+                if reached > best[0]:
+                    best = (reached, key)
+                    if reached == self.end:
+                        break
+        except _PlanTimeout as timeout:
+            timeout.best = best
+            raise
+        return best
+
+    def after_flap(self, t, y):
+        """Furthest frame reachable when flapping on frame t from height y"""
+        key = (t, y)
+        dead = self.dead.get(t)
+        if dead and y in dead:
+            return dead[y]
+        if key in self.memo:
+            return self.memo[key][0]
+        if time.perf_counter() > self.deadline:
+            raise _PlanTimeout
+
+        reached = self.fall(t, y, JUMP_STRENGTH)
+        next_flap = None
+        if reached < self.end:
+            # Flap again; re-flapping at once changes nothing
+            best = self.best_flap([(t + w, y + FLAP_DY[w]) for w in range(1, reached - t + 1)])
+            if best[0] > reached:
+                reached, next_flap = best
+        if reached < self.end:
+            self.dead.setdefault(t, {})[y] = reached
+        self.memo[key] = (reached, next_flap)
+        return reached
+
+# Fixed strings drawn by draw_playfield, as (text, size, colour, shadow offset)
+WARM_TEXT = [
+    ("Press SPACE to Start", SMALL_FONT_SIZE, WHITE, 2),
+    ("Press C to Change Character", TINY_FONT_SIZE, WHITE, 1),
+    ("Game Over!", FONT_SIZE, RED, 2),
+    ("Press SPACE to Restart", SMALL_FONT_SIZE, WHITE, 2),
+]
+
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, fps=FPS, speed=1.0, record_dir=None, replay=None,
+                 replay_range=None, profile=False, profile_out=None, autopilot=False,
+                 flock=None, flock_policy=None, flock_seed=None, capture=None,
+                 window_size=None, fullscreen=False, render_scale=None, courses=None,
+                 course_seed=None, input_wake=True, latency_out=None, latency_probe=False):
+        # Everything is drawn on self.screen at the logical resolution; in a
+        # window of any other size a RenderScaler upscales it to the display
+        if fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(window_size or (SCREEN_WIDTH, SCREEN_HEIGHT))
+        if self.window.get_size() == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            self.screen = self.window
+            self.scaler = None
+        else:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            self.scaler = RenderScaler((SCREEN_WIDTH, SCREEN_HEIGHT), self.window.get_size(),
+                                       1.0 / fps, render_scale)
         pygame.display.set_caption("Flappy Bird - Choose Your Character!")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 36)
-        self.tiny_font = pygame.font.Font(None, 24)
+        self.fps = fps
+        # Physics is per tick, so speed changes how fast the game plays, not
+        # how finely it is simulated; replays are tick-exact at any speed
+        self.sim_dt = 1.0 / (SIM_HZ * speed)  # Seconds per simulation tick
         
         self.character_selection = True
         self.selected_character = None
         self.jets = []  # List of jet planes
         self.jet_timer = 0
+
+        # Static sky, clouds and ground, composited once
+        self.background = self.render_background()
+        self.dirty_rects = []  # Screen areas drawn last frame
+        self.full_redraw = True
+
+        # Replays: record finished runs to record_dir, or play one back
+        self.record_dir = record_dir
+        self.recording = None
+        self.replay = replay
+        if replay:
+            self.character_selection = False
+            self.selected_character = replay.character
+            pygame.display.set_caption("Flappy Bird - Replay")
+        self.replay_start, self.replay_end = replay_range or (0, None)
+
+        # Attract mode: the autopilot plays and restarts after each game over
+        self.autopilot = Autopilot() if autopilot else None
+        if self.autopilot and not replay:
+            self.character_selection = False
+            self.selected_character = "bird"
+            pygame.display.set_caption("Flappy Bird - Attract Mode")
+
+        # Flock mode: a FlockEngine population steered by flock_policy(flock)
+        # flies one course (a fresh one each run unless flock_seed is given)
+        self.flock = flock
+        self.flock_policy = flock_policy
+        self.flock_seed = flock_seed
+        if flock:
+            self.character_selection = False
+            pygame.display.set_caption(f"Flappy Bird - Flock of {flock.count}")
+
+        # Frame-phase profiling (opt-in); F3 toggles the overlay
+        if profile or profile_out:
+            self.profiler = FrameProfiler(keep_frames=bool(profile_out))
+        else:
+            self.profiler = NullProfiler()
+        self.profile_out = profile_out
+        self.show_profiler = profile
+        self.profiler_overlay = None
+
+        # Footage capture (a FrameCapture), fed every presented frame
+        self.capture = capture
+
+        # Course source for new runs (see flappy_course); course_seed flies the
+        # same course every run instead of a random one
+        self.courses = courses or SEEDED_COURSES
+        self.course_seed = course_seed
+
+        # Text and sprites for later screens are rendered once the first frame is up
+        self.caches_warm = False
+
+        # Flap presses, as perf_counter timestamps, wait here for the tick
+        # covering that moment. With input_wake the idle wait handles events
+        # as they arrive and a press cuts it short so a frame runs as soon as
+        # that tick is due; without it input is polled once per frame.
+        self.flap_times = deque()
+        self.input_wake = input_wake
+
+        # Input-to-present latency log (opt-in); the probe injects SPACE presses
+        self.latency = LatencyLog() if latency_out or latency_probe else None
+        self.latency_out = latency_out
+        self.awaiting_present = []  # (timestamp, engine frame) of flaps not yet on screen
+        self.latency_probe = LatencyProbe(pygame.K_SPACE) if latency_probe else None
+        if self.latency_probe and not self.selected_character:
+            self.character_selection = False
+            self.selected_character = "bird"
         self.reset_game()
         
     def reset_game(self):
         # Don't reset character if already selected
-        if self.selected_character == "bird":
-            self.character = Bird(100, SCREEN_HEIGHT // 2)
-        elif self.selected_character == "mario":
-            self.character = Mario(100, SCREEN_HEIGHT // 2)
+        if self.selected_character:
+            self.start_engine(self.selected_character)
         else:
-            self.character = None
-            
-        self.pipes = []
-        self.pipe_timer = 0
-        self.score = 0
-        self.game_over = False
-        self.game_started = False
+            self.engine = None
+        if self.flock:
+            self.flock.reset(self.flock.courses.random_seed() if self.flock_seed is None
+                             else self.flock_seed)
+
+        self.flap_times.clear()
+        self.awaiting_present = []
+        self.game_started = bool(self.autopilot or self.flock)
+        self.game_over_ticks = 0
+
+        if self.replay:
+            # Fast-forward headlessly to the start of the segment to show
+            self.game_started = True
+            while self.engine.frame < min(self.replay_start, self.replay.frames):
+                self.engine.step(self.replay.flap_at(self.engine.frame))
         
         # Don't reset jets when resetting game
         if not hasattr(self, 'jets'):
             self.jets = []
             self.jet_timer = 0
         
+    def start_engine(self, character):
+        # An explicit seed makes every run reproducible from its inputs
+        if self.replay:
+            seed = self.replay.seed
+        elif self.course_seed is not None:
+            seed = self.course_seed
+        else:
+            seed = self.courses.random_seed()
+        self.engine = FlappyEngine(character, seed, courses=self.courses)
+        if self.record_dir:
+            self.recording = Replay(seed, character)
+
     def handle_character_selection(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_1:
                 self.selected_character = "bird"
-                self.character = Bird(100, SCREEN_HEIGHT // 2)
+                self.start_engine("bird")
                 self.character_selection = False
                 pygame.display.set_caption("Flappy Bird - Playing as Bird")
             elif event.key == pygame.K_2:
                 self.selected_character = "mario"
-                self.character = Mario(100, SCREEN_HEIGHT // 2)
+                self.start_engine("mario")
                 self.character_selection = False
                 pygame.display.set_caption("Flappy Bird - Playing as Mario")
         
-    def handle_events(self):
+    def handle_events(self, stamp=None):
+        """Apply the queued events as if received at `stamp` (default: now)"""
+        if stamp is None:
+            stamp = time.perf_counter()
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if not self.handle_event(event, stamp):
                 return False
-                
-            if self.character_selection:
-                self.handle_character_selection(event)
-            else:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        if not self.game_started:
-                            self.game_started = True
-                        if not self.game_over:
-                            self.character.jump()
-                        else:
-                            self.reset_game()
-                    elif event.key == pygame.K_c and (self.game_over or not self.game_started):
-                        # Allow changing character when game is over or not started
-                        self.character_selection = True
-                        self.selected_character = None
-                        self.reset_game()
+
+        if self.replay:
+            end = self.replay.frames if self.replay_end is None else self.replay_end
+            return self.engine.frame < end and not self.engine.done
         return True
-    
-    def update(self):
+
+    def handle_event(self, event, stamp):
+        """Apply one event received at perf_counter time `stamp`; False means quit"""
+        if event.type == pygame.QUIT:
+            return False
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.full_redraw = True
+        if (event.type == pygame.KEYDOWN and event.key == pygame.K_F3
+                and isinstance(self.profiler, FrameProfiler)):
+            self.show_profiler = not self.show_profiler
+
+        if self.replay or self.autopilot or self.flock:
+            # Playback, attract and flock modes ignore gameplay keys
+            return True
+        if self.character_selection:
+            self.handle_character_selection(event)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                if not self.game_started:
+                    self.game_started = True
+                if not self.game_over:
+                    # Probe presses carry the time they were sent; polled
+                    # events are backdated, so delivery uses the real time
+                    sent = getattr(event, "sent", None)
+                    if sent is not None and self.latency:
+                        self.latency.add("delivery", time.perf_counter() - sent)
+                    self.request_flap(stamp if sent is None else sent)
+                else:
+                    self.reset_game()
+            elif event.key == pygame.K_c and (self.game_over or not self.game_started):
+                # Allow changing character when game is over or not started
+                self.character_selection = True
+                self.selected_character = None
+                self.reset_game()
+        return True
+
+    def request_flap(self, stamp=None):
+        """Queue a flap that happened at perf_counter time `stamp` (default: now)"""
+        self.flap_times.append(time.perf_counter() if stamp is None else stamp)
+
+    def take_flaps(self, tick_end=None):
+        """Consume the flaps pressed before tick_end (all of them if None)"""
+        flap = False
+        flap_times = self.flap_times
+        while flap_times and (tick_end is None or flap_times[0] <= tick_end):
+            stamp = flap_times.popleft()
+            flap = True
+            if self.latency:
+                self.latency.add("input_to_tick", time.perf_counter() - stamp)
+                self.awaiting_present.append((stamp, self.engine.frame + 1))
+        return flap
+
+    @property
+    def game_over(self):
+        return self.engine is not None and self.engine.done
+
+    @property
+    def score(self):
+        return self.engine.score if self.engine else 0
+
+    def update(self, tick_end=None):
+        """Advance the simulation by one fixed tick ending at perf_counter time tick_end"""
+        # Remember where everything was so draw() can interpolate
+        for jet in self.jets:
+            jet.save_position()
+        if self.engine:
+            self.engine.character.save_position()
+            for pipe in self.engine.pipes:
+                pipe.save_position()
+        if self.flock:
+            self.flock.save_positions()
+
         # Update jets even when not playing
-        self.update_jets()
+        with self.profiler.phase("update_jets"):
+            self.update_jets()
+
+        if self.flock:
+            if self.flock.done:
+                self.restart_after_delay()
+            else:
+                with self.profiler.phase("update"):
+                    self.flock.step(self.flock_policy(self.flock))
+            return
         
         if self.character_selection or not self.game_started or self.game_over:
+            if self.autopilot and self.game_over:
+                self.restart_after_delay()
             return
-            
-        # Update character
-        self.character.update()
-        
-        # Check boundaries
-        if self.character.y <= 0 or self.character.y >= SCREEN_HEIGHT - GROUND_HEIGHT:
-            self.game_over = True
-            
-        # Spawn pipes
-        self.pipe_timer += 1
-        if self.pipe_timer >= 90:  # Spawn pipe every 1.5 seconds
-            self.pipes.append(Pipe(SCREEN_WIDTH))
-            self.pipe_timer = 0
-            
-        # Update pipes
-        for pipe in self.pipes[:]:
-            pipe.update()
-            
-            # Check collision
-            character_rect = self.character.get_rect()
-            top_rect, bottom_rect = pipe.get_rects()
-            if character_rect.colliderect(top_rect) or character_rect.colliderect(bottom_rect):
-                self.game_over = True
-                
-            # Check if character passed the pipe
-            if not pipe.passed and pipe.x + PIPE_WIDTH < self.character.x:
-                pipe.passed = True
-                self.score += 1
-                
-            # Remove off-screen pipes
-            if pipe.is_off_screen():
-                self.pipes.remove(pipe)
+
+        # The simulation itself lives in the engine; consume this frame's input
+        if self.replay:
+            flap = (self.engine.frame < self.replay.frames
+                    and self.replay.flap_at(self.engine.frame))
+        elif self.autopilot:
+            with self.profiler.phase("autopilot"):
+                flap = self.autopilot(self.engine)
+        else:
+            flap = self.take_flaps(tick_end)
+        with self.profiler.phase("update"):
+            self.engine.step(flap)
+        if self.engine.done:
+            self.flap_times.clear()  # Presses after the fatal tick have nothing to act on
+
+        if self.recording:
+            self.recording.record(flap)
+            if self.engine.done:
+                self.save_recording()
+
+    def restart_after_delay(self):
+        """Count game-over ticks in unattended modes and start the next run"""
+        self.game_over_ticks += 1
+        if self.game_over_ticks >= ATTRACT_RESTART_DELAY:
+            self.reset_game()
+
+    def save_recording(self):
+        self.recording.score = self.engine.score
+        os.makedirs(self.record_dir, exist_ok=True)
+        name = f"flappy-{time.strftime('%Y%m%d-%H%M%S')}-{self.recording.seed:016x}.fbr"
+        self.recording.save(os.path.join(self.record_dir, name))
+        self.recording = None
     
     def update_jets(self):
         # Spawn new jets randomly
@@ -588,21 +1675,34 @@ class Game:
             if jet.is_off_screen():
                 self.jets.remove(jet)
     
-    def draw_background(self, screen):
+    def render_background(self):
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
         # Sky
-        screen.fill(SKY_BLUE)
+        background.fill(SKY_BLUE)
         
         # Clouds (simple circles)
         for i in range(3):
             x = 50 + i * 150
             y = 50 + i * 30
-            pygame.draw.circle(screen, WHITE, (x, y), 30)
-            pygame.draw.circle(screen, WHITE, (x + 25, y), 25)
-            pygame.draw.circle(screen, WHITE, (x - 20, y), 25)
+            pygame.draw.circle(background, WHITE, (x, y), 30)
+            pygame.draw.circle(background, WHITE, (x + 25, y), 25)
+            pygame.draw.circle(background, WHITE, (x - 20, y), 25)
+
+        # Pipes stop at the ground and jets fly high, so it never needs redrawing
+        self.draw_ground(background)
+        return background.convert()
+
+    def draw_background(self, screen, alpha=1.0):
+        # Restore only what was drawn over last frame, unless the whole window is stale
+        if self.full_redraw:
+            screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                screen.blit(self.background, rect, rect)
         
         # Draw jets (behind everything else but in front of sky)
-        for jet in self.jets:
-            jet.draw(screen)
+        return [jet.draw(screen, alpha) for jet in self.jets]
     
     def draw_ground(self, screen):
         # Ground
@@ -612,118 +1712,425 @@ class Game:
         pygame.draw.rect(screen, GREEN, 
                         (0, SCREEN_HEIGHT - GROUND_HEIGHT, SCREEN_WIDTH, 20))
     
+    def draw_text(self, screen, text, size, color, center, shadow_offset=2):
+        """Blit cached text with its drop shadow, centred like the text alone"""
+        surface = text_cache.render(text, size, color, BLACK, shadow_offset)
+        width = surface.get_width() - shadow_offset
+        height = surface.get_height() - shadow_offset
+        return screen.blit(surface, (center[0] - width // 2, center[1] - height // 2))
+
     def draw_character_selection(self, screen):
-        # Draw background
-        self.draw_background(screen)
-        self.draw_ground(screen)
-        
+        dirty = []
+
         # Title
-        title_text = self.font.render("Choose Your Character", True, WHITE)
-        title_shadow = self.font.render("Choose Your Character", True, BLACK)
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        screen.blit(title_shadow, (title_rect.x + 2, title_rect.y + 2))
-        screen.blit(title_text, title_rect)
+        dirty.append(self.draw_text(screen, "Choose Your Character", FONT_SIZE, WHITE,
+                                    (SCREEN_WIDTH // 2, 100)))
         
         # Draw Bird preview
         bird_preview = Bird(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 - 50)
-        bird_preview.draw(screen)
-        bird_text = self.small_font.render("1. Bird", True, WHITE)
-        bird_shadow = self.small_font.render("1. Bird", True, BLACK)
-        bird_rect = bird_text.get_rect(center=(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 + 20))
-        screen.blit(bird_shadow, (bird_rect.x + 2, bird_rect.y + 2))
-        screen.blit(bird_text, bird_rect)
+        dirty.append(bird_preview.draw(screen))
+        dirty.append(self.draw_text(screen, "1. Bird", SMALL_FONT_SIZE, WHITE,
+                                    (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 + 20)))
         
         # Draw Mario preview
         mario_preview = Mario(3 * SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 - 50)
-        mario_preview.draw(screen)
-        mario_text = self.small_font.render("2. Mario", True, WHITE)
-        mario_shadow = self.small_font.render("2. Mario", True, BLACK)
-        mario_rect = mario_text.get_rect(center=(3 * SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 + 20))
-        screen.blit(mario_shadow, (mario_rect.x + 2, mario_rect.y + 2))
-        screen.blit(mario_text, mario_rect)
+        dirty.append(mario_preview.draw(screen))
+        dirty.append(self.draw_text(screen, "2. Mario", SMALL_FONT_SIZE, WHITE,
+                                    (3 * SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 + 20)))
         
         # Instructions
-        inst_text = self.tiny_font.render("Press 1 for Bird or 2 for Mario", True, WHITE)
-        inst_shadow = self.tiny_font.render("Press 1 for Bird or 2 for Mario", True, BLACK)
-        inst_rect = inst_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150))
-        screen.blit(inst_shadow, (inst_rect.x + 1, inst_rect.y + 1))
-        screen.blit(inst_text, inst_rect)
-    
-    def draw(self):
-        if self.character_selection:
-            self.draw_character_selection(self.screen)
-        else:
-            # Draw background
-            self.draw_background(self.screen)
-            
-            # Draw pipes
-            for pipe in self.pipes:
-                pipe.draw(self.screen)
-                
-            # Draw ground
-            self.draw_ground(self.screen)
-            
-            # Draw character
-            if self.character:
-                self.character.draw(self.screen)
-            
-            # Draw score
-            score_text = self.font.render(str(self.score), True, WHITE)
-            score_shadow = self.font.render(str(self.score), True, BLACK)
-            self.screen.blit(score_shadow, (SCREEN_WIDTH // 2 - 18, 52))
-            self.screen.blit(score_text, (SCREEN_WIDTH // 2 - 20, 50))
+        dirty.append(self.draw_text(screen, "Press 1 for Bird or 2 for Mario", TINY_FONT_SIZE, WHITE,
+                                    (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150), shadow_offset=1))
+        return dirty
+
+    def draw_playfield(self, screen, alpha=1.0):
+        dirty = []
+
+        # Draw pipes
+        with self.profiler.phase("draw_pipes"):
+            for pipe in self.engine.pipes:
+                dirty.extend(pipe.draw(screen, alpha))
             
-            # Draw game over or start message
-            if not self.game_started:
-                start_text = self.small_font.render("Press SPACE to Start", True, WHITE)
-                start_shadow = self.small_font.render("Press SPACE to Start", True, BLACK)
-                text_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-                self.screen.blit(start_shadow, (text_rect.x + 2, text_rect.y + 2))
-                self.screen.blit(start_text, text_rect)
-                
-                change_text = self.tiny_font.render("Press C to Change Character", True, WHITE)
-                change_shadow = self.tiny_font.render("Press C to Change Character", True, BLACK)
-                change_rect = change_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40))
-                self.screen.blit(change_shadow, (change_rect.x + 1, change_rect.y + 1))
-                self.screen.blit(change_text, change_rect)
-            elif self.game_over:
-                game_over_text = self.font.render("Game Over!", True, RED)
-                game_over_shadow = self.font.render("Game Over!", True, BLACK)
-                text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-                self.screen.blit(game_over_shadow, (text_rect.x + 2, text_rect.y + 2))
-                self.screen.blit(game_over_text, text_rect)
-                
-                restart_text = self.small_font.render("Press SPACE to Restart", True, WHITE)
-                restart_shadow = self.small_font.render("Press SPACE to Restart", True, BLACK)
-                text_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
-                self.screen.blit(restart_shadow, (text_rect.x + 2, text_rect.y + 2))
-                self.screen.blit(restart_text, text_rect)
-                
-                change_text = self.tiny_font.render("Press C to Change Character", True, WHITE)
-                change_shadow = self.tiny_font.render("Press C to Change Character", True, BLACK)
-                change_rect = change_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 45))
-                self.screen.blit(change_shadow, (change_rect.x + 1, change_rect.y + 1))
-                self.screen.blit(change_text, change_rect)
-                
-                final_score_text = self.small_font.render(f"Score: {self.score}", True, WHITE)
-                final_score_shadow = self.small_font.render(f"Score: {self.score}", True, BLACK)
-                text_rect = final_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80))
-                self.screen.blit(final_score_shadow, (text_rect.x + 2, text_rect.y + 2))
-                self.screen.blit(final_score_text, text_rect)
-        
-        pygame.display.flip()
+        # Draw character
+        with self.profiler.phase("draw_character"):
+            dirty.append(self.engine.character.draw(screen, alpha))
+        
+        # Draw score
+        score_surface = text_cache.render(str(self.score), FONT_SIZE, WHITE, BLACK, 2)
+        dirty.append(screen.blit(score_surface, (SCREEN_WIDTH // 2 - 20, 50)))
+        
+        # Draw game over or start message
+        if not self.game_started:
+            dirty.append(self.draw_text(screen, "Press SPACE to Start", SMALL_FONT_SIZE, WHITE,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+            dirty.append(self.draw_text(screen, "Press C to Change Character", TINY_FONT_SIZE, WHITE,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40), shadow_offset=1))
+        elif self.game_over:
+            dirty.append(self.draw_text(screen, "Game Over!", FONT_SIZE, RED,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50)))
+            dirty.append(self.draw_text(screen, "Press SPACE to Restart", SMALL_FONT_SIZE, WHITE,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10)))
+            dirty.append(self.draw_text(screen, "Press C to Change Character", TINY_FONT_SIZE, WHITE,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 45), shadow_offset=1))
+            dirty.append(self.draw_text(screen, f"Score: {self.score}", SMALL_FONT_SIZE, WHITE,
+                                        (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80)))
+        return dirty
+
+    def draw_flock(self, screen, alpha=1.0):
+        flock = self.flock
+        dirty = []
+
+        with self.profiler.phase("draw_pipes"):
+            for pipe in flock.pipes:
+                dirty.extend(pipe.draw(screen, alpha))
+
+        # Every live character in one blits call, from the cached animation frames
+        with self.profiler.phase("draw_character"):
+            live = flock.live
+            if len(live):
+                # Birds flap in step (all have flown every frame); Mario's
+                # arms are up for 20 frames after each flap
+                jumping = flock.frame - flock.flap_frame[live] < 20
+                frames = {Bird: (flock.frame // 10) % 3}
+                sprites, origins = [], []
+                for prototype in flock.prototypes:
+                    for raised in (False, True):
+                        prototype.set_sprite_frame(frames.get(type(prototype), raised))
+                        sprites.append(prototype.get_sprite())
+                        origins.append(prototype.sprite_origin)
+                which = flock.kind[live] * 2 + jumping
+                origins = np.array(origins)[which]
+                y = flock.prev_y[live] + (flock.y[live] - flock.prev_y[live]) * alpha
+                left = int(flock.x) - origins[:, 0]
+                top = y.astype(np.int64) - origins[:, 1]
+                screen.blits(list(zip([sprites[i] for i in which.tolist()],
+                                      zip(left.tolist(), top.tolist()))), doreturn=False)
+                width = max(sprite.get_width() for sprite in sprites)
+                height = max(sprite.get_height() for sprite in sprites)
+                dirty.append(pygame.Rect(int(left.min()), int(top.min()),
+                                         int(left.max() - left.min()) + width,
+                                         int(top.max() - top.min()) + height))
+
+        # Best score and survivors
+        score_surface = text_cache.render(str(int(flock.score.max(initial=0))), FONT_SIZE,
+                                          WHITE, BLACK, 2)
+        dirty.append(screen.blit(score_surface, (SCREEN_WIDTH // 2 - 20, 50)))
+        dirty.append(self.draw_text(screen, f"Alive: {flock.alive}/{flock.count}", TINY_FONT_SIZE,
+                                    WHITE, (SCREEN_WIDTH // 2, 110), shadow_offset=1))
+        return dirty
+
+    def draw(self, alpha=1.0):
+        """Render the current state; alpha blends from the previous tick (0) to this one (1)"""
+        with self.profiler.phase("draw_background"):
+            dirty = self.draw_background(self.screen, alpha)
+        if self.flock:
+            dirty.extend(self.draw_flock(self.screen, alpha))
+        elif self.character_selection:
+            dirty.extend(self.draw_character_selection(self.screen))
+        else:
+            dirty.extend(self.draw_playfield(self.screen, alpha))
+        if self.show_profiler:
+            dirty.append(self.draw_profiler_overlay(self.screen))
+
+        # Present only the areas touched this frame or last frame
+        with self.profiler.phase("present"):
+            if self.scaler:
+                if self.full_redraw:
+                    self.window.fill(BLACK)  # Letterbox bars
+                viewport = self.scaler.present(self.screen, self.window)
+            if self.full_redraw:
+                pygame.display.flip()
+                self.full_redraw = False
+            elif self.scaler:
+                pygame.display.update(viewport)
+            else:
+                pygame.display.update(self.dirty_rects + dirty)
+        if self.awaiting_present:
+            self.log_presented_flaps(alpha)
+        self.dirty_rects = dirty
+        if self.capture:
+            with self.profiler.phase("capture"):
+                self.capture.capture(self.screen)
+
+    def log_presented_flaps(self, alpha):
+        """Record latency for flaps whose tick this frame shows (alpha 0 is the tick before)"""
+        presented = time.perf_counter()
+        shown = self.engine.frame if alpha > 0 else self.engine.frame - 1
+        waiting = []
+        for stamp, frame in self.awaiting_present:
+            if frame <= shown:
+                self.latency.add("input_to_present", presented - stamp)
+            else:
+                waiting.append((stamp, frame))
+        self.awaiting_present = waiting
+
+    def draw_profiler_overlay(self, screen):
+        # Re-render the table twice a second; the numbers are rolling stats anyway
+        now = time.perf_counter()
+        if self.profiler_overlay is None or now - self.profiler_overlay[0] > 0.5:
+            surface = self.profiler.render_overlay(text_cache.get_font(18))
+            self.profiler_overlay = (now, surface)
+        return screen.blit(self.profiler_overlay[1], (4, 4))
     
     def run(self):
+        # Fixed-timestep loop: the simulation ticks every sim_dt seconds of
+        # wall-clock time whatever the render rate, and draw() interpolates
+        # between the last two ticks
         running = True
+        accumulator = 0.0
+        previous = deadline = time.perf_counter()
+        if self.latency_probe:
+            self.latency_probe.start()
         while running:
-            running = self.handle_events()
+            now = time.perf_counter()
+            accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
+
+            # Events still queued arrived after the last wait stopped listening
+            # (or during an overrun frame); date them to the earlier of the
+            # previous deadline and this frame's first tick so none slips a frame
+            with self.profiler.phase("handle_events"):
+                running = self.handle_events(min(deadline, now - accumulator + self.sim_dt))
+            # Each tick covers the sim_dt of wall-clock time ending at
+            # now - accumulator + sim_dt and takes the flaps pressed by then
+            while accumulator >= self.sim_dt:
+                self.update(now - accumulator + self.sim_dt)
+                accumulator -= self.sim_dt
+            self.draw(accumulator / self.sim_dt)
+            if self.scaler:
+                self.scaler.end_frame(time.perf_counter() - now)
+            if not self.caches_warm:
+                self.warm_caches()
+            # Frame deadlines are absolute so wake-up overshoot does not add up
+            deadline = max(deadline + 1.0 / self.fps, now)
+            with self.profiler.phase("idle"):
+                if running:
+                    running = self.wait_for_frame(deadline, now - accumulator + self.sim_dt)
+            self.profiler.end_frame()
+        self.shutdown()
+
+    def wait_for_frame(self, deadline, next_tick):
+        """Sleep until deadline, handling events the moment they arrive.
+
+        Interpolation shows a tick's effect as soon as its end time passes,
+        so with input_wake a flap press moves the deadline up to next_tick,
+        the end of the tick that will take it, instead of the next frame
+        boundary. Without input_wake this just sleeps and events wait for
+        the next frame's poll. Returns False if the window was closed.
+        """
+        if not self.input_wake:
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            return True
+        while True:
+            if self.flap_times:
+                deadline = min(deadline, next_tick)
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return True
+            event = pygame.event.wait(max(1, int(remaining * 1000)))
+            if event.type != pygame.NOEVENT and not self.handle_event(event, time.perf_counter()):
+                return False
+
+    def warm_caches(self):
+        """Pre-render everything the first game would otherwise render mid-play"""
+        for cls in (Bird, Mario):
+            prototype = cls(0, 0)
+            for frame in cls.sprite_frames:
+                prototype.set_sprite_frame(frame)
+                prototype.get_sprite()
+        get_smoke_sprites()
+        text_cache.render("Welcome Tambay", 20, WHITE)
+        for digit in range(10):
+            text_cache.render(str(digit), FONT_SIZE, WHITE, BLACK, 2)
+        for text, size, color, shadow_offset in WARM_TEXT:
+            text_cache.render(text, size, color, BLACK, shadow_offset)
+        self.caches_warm = True
+
+    def run_offline(self):
+        """Draw every simulation tick as fast as possible, e.g. to export a replay"""
+        while self.handle_events():
             self.update()
             self.draw()
-            self.clock.tick(FPS)
-            
+            self.profiler.end_frame()
+        self.shutdown()
+
+    def shutdown(self):
+        if self.profile_out:
+            self.profiler.export(self.profile_out)
+        if self.latency_probe:
+            self.latency_probe.stop()
+        if self.latency:
+            print(self.latency.report())
+            if self.latency_out:
+                self.latency.export(self.latency_out)
+        if self.capture:
+            self.capture.close()
+            print(f"captured {self.capture.captured} frames, dropped {self.capture.dropped}")
         pygame.quit()
         sys.exit()
 
+def parse_size(text):
+    """"WxH" -> (W, H)"""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"window size must be positive, got {text!r}")
+    return width, height
+
+def parse_seed(text):
+    """Course seed in 0..MAX_SEED, the range a replay header can store"""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer seed, got {text!r}")
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be in 0..{MAX_SEED}, got {text!r}")
+    return seed
+
+def main():
+    parser = argparse.ArgumentParser(description="Flappy Bird - Welcome Tambay Edition")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="render rate cap (default: %(default)s)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="game speed: ticks run at this multiple of %d per second; physics "
+                             "is per tick, so this speeds the game up or slows it down "
+                             "(default: %%(default)s)" % SIM_HZ)
+    parser.add_argument("--record", metavar="DIR",
+                        help="save a replay of every finished run into DIR")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play back a recorded run instead of playing")
+    parser.add_argument("--start", type=int, default=0,
+                        help="first frame of the replay segment to show")
+    parser.add_argument("--end", type=int, default=None,
+                        help="frame to stop the replay at (default: end of run)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each frame phase and show the overlay (toggle with F3)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="write per-frame phase timings on exit (.csv or .json)")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="attract mode: a lookahead bot plays and restarts by itself")
+    parser.add_argument("--flock", type=int, metavar="N",
+                        help="fly N demo characters on one shared course")
+    parser.add_argument("--flock-character", choices=["bird", "mario", "mixed"], default="mixed",
+                        help="characters in the flock (default: %(default)s)")
+    parser.add_argument("--ghosts", metavar="FILE", nargs="+",
+                        help="replay several recorded runs of the same course together")
+    parser.add_argument("--capture", metavar="OUT",
+                        help="record footage: OUT.rgb (raw RGB24), a directory/ (PNGs) "
+                             "or a video file encoded by ffmpeg")
+    parser.add_argument("--window", type=parse_size, metavar="WxH",
+                        help="window size; the 400x600 playfield is scaled to fit")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="fill the desktop, scaling the playfield to fit")
+    parser.add_argument("--render-scale", type=float, choices=RENDER_SCALES,
+                        help="fix the upscaling resolution (1, 0.5, or 0 for "
+                             "nearest-neighbour) instead of adapting it to frame time")
+    parser.add_argument("--courses", metavar="BANK",
+                        help="draw courses from a pre-generated bank (see flappy_course.py)")
+    parser.add_argument("--course-seed", type=parse_seed, metavar="SEED",
+                        help="fly the course with this seed on every run")
+    parser.add_argument("--no-input-wake", action="store_true",
+                        help="sleep between frames and poll input once per frame, as a baseline "
+                             "for latency comparisons")
+    parser.add_argument("--latency-out", metavar="FILE",
+                        help="log per-flap input latencies and write them on exit (.csv or .json)")
+    parser.add_argument("--latency-probe", action="store_true",
+                        help="measure latency with synthetic SPACE presses at random times")
+    parser.add_argument("--headless", action="store_true",
+                        help="with --replay, render without a window as fast as possible")
+    parser.add_argument("--verify", metavar="FILE", nargs="+",
+                        help="re-simulate replays headlessly and check their scores")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    def load_replay(path):
+        try:
+            replay = Replay.load(path)
+        except (OSError, ReplayError) as e:
+            parser.error(f"cannot load replay {path}: {e}")
+        if replay.character not in CHARACTERS:
+            parser.error(f"cannot load replay {path}: unknown character {replay.character!r}")
+        return replay
+
+    if args.verify:
+        all_valid = True
+        for path in args.verify:
+            try:
+                replay = Replay.load(path)
+                valid, engine = verify_replay(replay)
+            except (OSError, ReplayError, KeyError) as e:
+                print(f"{path}: INVALID ({e})")
+                all_valid = False
+                continue
+            if valid:
+                print(f"{path}: OK score={replay.score}")
+            else:
+                print(f"{path}: MISMATCH claimed={replay.score} "
+                      f"actual={engine.score} frames={engine.frame}/{replay.frames}")
+                all_valid = False
+        sys.exit(0 if all_valid else 1)
+
+    courses = None
+    if args.courses:
+        try:
+            courses = CourseBank(args.courses)
+        except (OSError, CourseError) as e:
+            parser.error(f"cannot load course bank {args.courses}: {e}")
+
+    flock = flock_policy = flock_seed = None
+    if args.ghosts:
+        replays = [load_replay(path) for path in args.ghosts]
+        flock_seed = replays[0].seed
+        for path, replay in zip(args.ghosts, replays):
+            if replay.seed != flock_seed:
+                print(f"{path}: skipped, recorded on a different course")
+        replays = [replay for replay in replays if replay.seed == flock_seed]
+        flock = FlockEngine([replay.character for replay in replays], courses=courses)
+        flock_policy = GhostPilot(replays)
+    elif args.flock:
+        if args.flock_character == "mixed":
+            names = [("bird", "mario")[i % 2] for i in range(args.flock)]
+        else:
+            names = [args.flock_character] * args.flock
+        flock = FlockEngine(names, courses=courses)
+        flock_seed = args.course_seed
+        flock_policy = CrowdPilot(args.flock)
+
+    if args.headless:
+        if not args.replay:
+            parser.error("--headless needs --replay")
+        # SDL's off-screen driver; the display is not initialised until Game()
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+    capture = None
+    if args.capture:
+        # Offline rendering emits one frame per tick and never drops any
+        rate = round(SIM_HZ * args.speed) if args.headless else args.fps
+        try:
+            sink = open_sink(args.capture, (SCREEN_WIDTH, SCREEN_HEIGHT), rate)
+        except OSError as e:
+            parser.error(f"cannot capture to {args.capture}: {e}")
+        capture = FrameCapture(sink, (SCREEN_WIDTH, SCREEN_HEIGHT), block=args.headless)
+
+    replay = load_replay(args.replay) if args.replay else None
+    game = Game(fps=args.fps, speed=args.speed, record_dir=args.record,
+                replay=replay, replay_range=(args.start, args.end),
+                profile=args.profile, profile_out=args.profile_out,
+                autopilot=args.autopilot, flock=flock, flock_policy=flock_policy,
+                flock_seed=flock_seed, capture=capture, window_size=args.window,
+                fullscreen=args.fullscreen and not args.headless,
+                render_scale=args.render_scale, courses=courses,
+                course_seed=args.course_seed, input_wake=not args.no_input_wake,
+                latency_out=args.latency_out, latency_probe=args.latency_probe)
+    if args.headless:
+        game.run_offline()
+    else:
+        game.run()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    main()
\ No newline at end of file
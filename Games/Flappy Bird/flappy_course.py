@@ -0,0 +1,137 @@
+"""Pipe courses: the gap heights a run meets, in spawn order, keyed by seed.
+
+A course source has heights(seed), returning an endless iterator of pipe
+heights, and random_seed() for runs that do not ask for a particular
+course. SeededCourses draws heights lazily from random.Random(seed) exactly
+as the engines always have, so replays and evaluation results stay valid.
+
+CourseBank stores the first pipes of every course in a seed range in a
+fixed-width file that any number of processes can mmap and share through
+the page cache. A run that outlives its banked prefix continues on the
+seeded stream, so a bank never changes a course, only what it costs.
+
+Bank layout (little-endian):
+    magic b"FBCB", version (u8), bytes per height (u8), first seed (u64),
+    courses (u32), pipes per course (u32), lowest height (u16),
+    highest height (u16), then courses * pipes unsigned heights, row-major.
+
+    python flappy_course.py build bank.fbc --seeds 0:100000 --pipes 200
+    python flappy_course.py show bank.fbc 42
+"""
+import argparse
+import itertools
+import random
+import struct
+
+import numpy as np
+
+MAGIC = b"FBCB"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBQIIHH")
+
+class CourseError(ValueError):
+    """Raised when a course bank is malformed or from an unknown version"""
+
+class SeededCourses:
+    """Courses generated on demand; heights(None) is a fresh random course"""
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def random_seed(self):
+        return random.getrandbits(64)
+
+    def heights(self, seed):
+        rng = random.Random(seed)
+        low, high = self.low, self.high
+        while True:
+            yield rng.randint(low, high)
+
+class CourseBank:
+    """Memory-mapped pre-generated courses for seeds first_seed..first_seed+courses-1"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise CourseError("course bank is truncated")
+        magic, version, width, first_seed, courses, pipes, low, high = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise CourseError("not a Flappy course bank")
+        if version != VERSION:
+            raise CourseError(f"unsupported course bank version {version}")
+        if width not in (1, 2):
+            raise CourseError(f"unsupported height width {width}")
+        self.path = path
+        self.first_seed = first_seed
+        self.courses = courses
+        self.pipes = pipes
+        self.fallback = SeededCourses(low, high)
+        dtype = np.uint8 if width == 1 else np.dtype("<u2")
+        try:
+            self.table = np.memmap(path, dtype=dtype, mode="r", offset=_HEADER.size,
+                                   shape=(courses, pipes))
+        except ValueError as e:
+            raise CourseError(f"course bank is truncated: {e}") from None
+
+    def __contains__(self, seed):
+        return seed is not None and self.first_seed <= seed < self.first_seed + self.courses
+
+    def random_seed(self):
+        """A seed whose course is banked"""
+        return self.first_seed + random.randrange(self.courses)
+
+    def heights(self, seed):
+        if seed not in self:
+            return self.fallback.heights(seed)
+        return self.banked_heights(seed)
+
+    def banked_heights(self, seed):
+        yield from self.table[seed - self.first_seed].tolist()
+        yield from itertools.islice(self.fallback.heights(seed), self.pipes, None)
+
+    @staticmethod
+    def build(path, source, first_seed, courses, pipes, chunk=4096):
+        """Write the first `pipes` heights of each seed's course from `source`"""
+        width = 1 if source.high <= 0xFF else 2
+        dtype = np.uint8 if width == 1 else np.dtype("<u2")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, width, first_seed, courses, pipes,
+                                 source.low, source.high))
+            block = np.empty((chunk, pipes), dtype=dtype)
+            for start in range(first_seed, first_seed + courses, chunk):
+                stop = min(start + chunk, first_seed + courses)
+                for row, seed in enumerate(range(start, stop)):
+                    block[row] = list(itertools.islice(source.heights(seed), pipes))
+                f.write(block[:stop - start].tobytes())
+
+def main():
+    from flappy_bird import PIPE_HEIGHTS  # Only the CLI needs the game's geometry
+    from flappy_eval import parse_seeds
+
+    parser = argparse.ArgumentParser(description="Build or inspect pre-generated course banks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="pre-generate courses for a seed range")
+    build.add_argument("path")
+    build.add_argument("--seeds", type=parse_seeds, default=(0, 10000),
+                       help="course count N, or a seed range A:B (default: 10000)")
+    build.add_argument("--pipes", type=int, default=200,
+                       help="pipes stored per course; longer runs continue on the seeded "
+                            "stream (default: %(default)s)")
+    show = commands.add_parser("show", help="print a bank's header or one course")
+    show.add_argument("path")
+    show.add_argument("seed", type=int, nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start, stop = args.seeds
+        CourseBank.build(args.path, SeededCourses(*PIPE_HEIGHTS), start, stop - start, args.pipes)
+        return
+    bank = CourseBank(args.path)
+    if args.seed is None:
+        print(f"seeds {bank.first_seed}..{bank.first_seed + bank.courses - 1}, "
+              f"{bank.pipes} pipes each, heights {bank.fallback.low}..{bank.fallback.high}")
+    else:
+        print(" ".join(map(str, itertools.islice(bank.heights(args.seed), bank.pipes))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Parallel evaluation of Flappy policies over many seeded headless episodes.
+
+A policy is any picklable callable taking a FlappyEngine and returning
+whether to flap this frame (module-level functions qualify). Seeds are
+split into contiguous chunks and run on a process pool; per-episode results
+stream back as chunks finish and are folded into an EvalSummary:
+
+    python flappy_eval.py --seeds 10000 --workers 32
+    python flappy_eval.py --policy my_bots:careful --seeds 0:5000
+    python flappy_eval.py --seeds 10000 --courses bank.fbc  # see flappy_course.py
+    python flappy_eval.py --seeds 1500 --check-swept  # swept vs discrete collisions
+
+With --courses each worker memory-maps the bank once instead of
+regenerating every course.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from flappy_bird import (FlappyEngine, GRAVITY, GROUND_HEIGHT, JUMP_STRENGTH, PIPE_GAP,
+                         PIPE_SPEED, PIPE_WIDTH, SCREEN_HEIGHT)
+from flappy_course import CourseBank
+
+# Episodes still alive after this many frames (about 220 pipes) end as timeouts
+MAX_FRAMES = 20_000
+
+DEATH_CAUSES = ("ground", "ceiling", "top_pipe", "bottom_pipe")
+AIM_ERROR = 20  # Pixels the baseline bot may misjudge each gap by, either way
+
+def gap_policy(engine):
+    """Baseline bot: flap when falling below the next gap's lower part.
+
+    Its aim is off by up to AIM_ERROR pixels per pipe (derived from the
+    pipe and score, so runs stay reproducible), which makes it fallible
+    enough for the score distribution to say something.
+    """
+    character = engine.character
+    gap_top = 160
+    error = 0
+    for pipe in engine.pipes:
+        if pipe.x + PIPE_WIDTH >= character.x - character.size:
+            gap_top = pipe.height
+            error = (pipe.height * 37 + engine.score * 101) % (2 * AIM_ERROR + 1) - AIM_ERROR
+            break
+    return character.y > gap_top + 125 + error and character.velocity > 0
+
+# Course banks opened by this process, by path
+_banks = {}
+
+def open_courses(path):
+    """Course source for a bank path (None for seeded courses), mapped once per process"""
+    if path is None:
+        return None
+    bank = _banks.get(path)
+    if bank is None:
+        bank = _banks[path] = CourseBank(path)
+    return bank
+
+def run_episode(policy, seed, character="bird", max_frames=MAX_FRAMES, courses=None):
+    """Play one headless episode; returns (seed, score, frames, death cause)"""
+    engine = FlappyEngine(character, seed, courses=courses)
+    while not engine.step(policy(engine)):
+        if engine.frame >= max_frames:
+            return seed, engine.score, engine.frame, "timeout"
+    return seed, engine.score, engine.frame, engine.death_cause
+
+def run_chunk(policy, start, stop, character="bird", max_frames=MAX_FRAMES, courses_path=None):
+    """Worker entry point: play every seed in range(start, stop)"""
+    courses = open_courses(courses_path)
+    return [run_episode(policy, seed, character, max_frames, courses)
+            for seed in range(start, stop)]
+
+def frame_state(engine, flap):
+    """What tunnels() needs about the frame step(flap) is about to run"""
+    character = engine.character
+    velocity = JUMP_STRENGTH if flap else character.velocity
+    return (character.x, character.y, velocity, character.size,
+            [(pipe.x, pipe.height) for pipe in engine.pipes])
+
+def tunnels(state, samples=1000):
+    """Whether a frame's motion overlaps something strictly between whole frames.
+
+    Samples the no-flap path y + velocity*t + GRAVITY*t*(t+1)/2 and each
+    pipe's linear motion inside (0, 1), with the box step() collides with.
+    """
+    character_x, start_y, velocity, size, pipes = state
+    left, right = character_x - size, character_x + size
+    for i in range(1, samples):
+        t = i / samples
+        y = start_y + velocity * t + GRAVITY * t * (t + 1) / 2
+        if y <= 0 or y >= SCREEN_HEIGHT - GROUND_HEIGHT:
+            return True
+        for pipe_x, height in pipes:
+            x = pipe_x - PIPE_SPEED * t
+            if x < right and left < x + PIPE_WIDTH and (
+                    y - size < height or y + size - 1 > height + PIPE_GAP):
+                return True
+    return False
+
+def check_swept(policy, seed, character="bird", max_frames=MAX_FRAMES, courses=None):
+    """Fly one episode in discrete and swept mode on the same inputs.
+
+    Returns None if they agree, else a description. Swept mode may end a
+    run early only on a frame whose motion really tunnelled through
+    something, and it must never outlive the discrete run.
+    """
+    discrete = FlappyEngine(character, seed, courses=courses)
+    swept = FlappyEngine(character, seed, swept=True, courses=courses)
+    while discrete.frame < max_frames:
+        flap = bool(policy(discrete))
+        state = frame_state(swept, flap)
+        discrete_done, swept_done = discrete.step(flap), swept.step(flap)
+        if swept_done and not discrete_done and not tunnels(state):
+            return (f"seed {seed}: swept died at frame {swept.frame} ({swept.death_cause}) "
+                    f"without tunnelling")
+        if discrete_done and not swept_done:
+            return (f"seed {seed}: discrete died at frame {discrete.frame} "
+                    f"({discrete.death_cause}), swept flew on")
+        if discrete_done or swept_done:
+            return None
+    return None
+
+def chunk_ranges(start, stop, chunk_size):
+    for low in range(start, stop, chunk_size):
+        yield low, min(low + chunk_size, stop)
+
+def run_episodes(policy, seeds, character="bird", workers=None, chunk_size=None,
+                 max_frames=MAX_FRAMES, courses_path=None):
+    """Yield episode results for range(*seeds) in completion order.
+
+    Chunks default to about eight per worker, enough to balance uneven
+    episode lengths while keeping scheduling overhead negligible. Workers
+    receive the course bank's path, not its contents.
+    """
+    start, stop = seeds
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, (stop - start) // (workers * 8))
+    if workers == 1:
+        for low, high in chunk_ranges(start, stop, chunk_size):
+            yield from run_chunk(policy, low, high, character, max_frames, courses_path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, policy, low, high, character, max_frames, courses_path)
+                   for low, high in chunk_ranges(start, stop, chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+class EvalSummary:
+    """Running aggregate of episode results; timeouts are kept apart from deaths"""
+    def __init__(self):
+        self.episodes = 0
+        self.timeouts = 0
+        self.timeout_scores = []
+        self.scores = Counter()  # Score -> episodes that ended in a death
+        self.causes = Counter()
+        self.lengths = []
+
+    def add(self, result):
+        seed, score, frames, cause = result
+        self.episodes += 1
+        if cause == "timeout":
+            self.timeouts += 1
+            self.timeout_scores.append(score)
+            return
+        self.scores[score] += 1
+        self.causes[cause] += 1
+        self.lengths.append(frames)
+
+    @staticmethod
+    def percentiles(values):
+        values = sorted(values)
+        if not values:
+            return {"p50": 0, "p95": 0, "p99": 0, "max": 0}
+        def pick(p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))]
+        return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": values[-1]}
+
+    def score_values(self):
+        return [score for score, count in self.scores.items() for _ in range(count)]
+
+    def report(self):
+        scores = self.score_values()
+        mean = sum(scores) / len(scores) if scores else 0.0
+        score_stats = self.percentiles(scores)
+        length_stats = self.percentiles(self.lengths)
+        lines = [f"episodes  {self.episodes}  ({self.episodes - self.timeouts} deaths, "
+                 f"{self.timeouts} timeouts)",
+                 f"score     mean {mean:.2f}  p50 {score_stats['p50']}  p95 {score_stats['p95']}"
+                 f"  p99 {score_stats['p99']}  max {score_stats['max']}",
+                 f"frames    p50 {length_stats['p50']}  p95 {length_stats['p95']}"
+                 f"  p99 {length_stats['p99']}  max {length_stats['max']}",
+                 "deaths    " + "  ".join(f"{cause} {self.causes[cause]}"
+                                          for cause in DEATH_CAUSES if self.causes[cause])]
+        lines.append("scores    " + "  ".join(f"{score}:{count}"
+                                              for score, count in sorted(self.scores.items())))
+        if self.timeouts:
+            lines.append(f"timeouts  {self.timeouts} still alive at the frame cap, scores "
+                         f"{min(self.timeout_scores)}..{max(self.timeout_scores)}; "
+                         "the statistics above cover deaths only")
+        return "\n".join(lines)
+
+def load_policy(spec):
+    """Resolve "module:function" to a policy callable"""
+    module_name, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"policy must look like module:function, got {spec!r}")
+    return getattr(importlib.import_module(module_name), name)
+
+def parse_seeds(text):
+    """"N" means seeds 0..N-1; "A:B" means A..B-1"""
+    if ":" in text:
+        start, stop = text.split(":")
+        return int(start), int(stop)
+    return 0, int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policy", default="flappy_eval:gap_policy",
+                        help="policy as module:function (default: %(default)s)")
+    parser.add_argument("--seeds", type=parse_seeds, default=(0, 1000),
+                        help="episode count N, or a seed range A:B (default: 1000)")
+    parser.add_argument("--character", default="bird", choices=["bird", "mario"])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="seeds per task (default: about eight tasks per worker)")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES,
+                        help="end an episode as a timeout after this many frames "
+                             "(default: %(default)s)")
+    parser.add_argument("--courses", metavar="BANK",
+                        help="pre-generated course bank shared by all workers")
+    parser.add_argument("--progress", type=int, default=0, metavar="N",
+                        help="print a running summary every N episodes")
+    parser.add_argument("--check-swept", action="store_true",
+                        help="instead of evaluating, check that swept collisions end runs "
+                             "early only where the discrete step tunnels")
+    args = parser.parse_args()
+
+    policy = load_policy(args.policy)
+    if args.check_swept:
+        courses = open_courses(args.courses)
+        failures = [failure for failure in (check_swept(policy, seed, args.character,
+                                                        args.max_frames, courses)
+                                            for seed in range(*args.seeds)) if failure]
+        for failure in failures:
+            print(failure)
+        print(f"swept check: {args.seeds[1] - args.seeds[0]} episodes, {len(failures)} mismatches")
+        sys.exit(1 if failures else 0)
+    summary = EvalSummary()
+    started = time.perf_counter()
+    for result in run_episodes(policy, args.seeds, args.character, args.workers,
+                               args.chunk_size, args.max_frames, args.courses):
+        summary.add(result)
+        if args.progress and summary.episodes % args.progress == 0:
+            print(f"[{summary.episodes} episodes, {time.perf_counter() - started:.1f}s]",
+                  file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(summary.report())
+    print(f"elapsed   {elapsed:.2f}s ({summary.episodes / max(elapsed, 1e-9):.0f} episodes/s)")
+
+if __name__ == "__main__":
+    main()
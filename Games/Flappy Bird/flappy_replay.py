@@ -0,0 +1,90 @@
+"""Compact binary replays: course seed, character and one input bit per frame.
+
+A replay holds everything FlappyEngine needs to reproduce a run exactly, so
+a claimed score can be verified by re-simulating it headlessly.
+
+File layout (little-endian):
+    magic b"FBRP", version (u8), seed (u64), frames (u32), score (u32),
+    character name length (u8) + UTF-8 name,
+    zlib-compressed input bits, packed LSB-first, one bit per engine frame.
+"""
+import struct
+import zlib
+
+MAGIC = b"FBRP"
+VERSION = 1
+_HEADER = struct.Struct("<4sBQII")
+MAX_SEED = 2 ** 64 - 1  # the header stores the seed as a u64
+
+class ReplayError(ValueError):
+    """Raised when replay data is malformed or from an unknown version"""
+
+class Replay:
+    def __init__(self, seed, character, score=0, frames=0, bits=None):
+        if not isinstance(seed, int) or not 0 <= seed <= MAX_SEED:
+            raise ReplayError(f"replay seed must be an integer in 0..{MAX_SEED}, got {seed!r}")
+        self.seed = seed
+        self.character = character
+        self.score = score
+        self.frames = frames
+        self.bits = bytearray(bits or b"")
+
+    def record(self, flap):
+        """Append one frame's input"""
+        if self.frames % 8 == 0:
+            self.bits.append(0)
+        if flap:
+            self.bits[-1] |= 1 << (self.frames % 8)
+        self.frames += 1
+
+    def flap_at(self, frame):
+        return bool(self.bits[frame // 8] >> (frame % 8) & 1)
+
+    def inputs(self):
+        """Yield the recorded flap flag for every frame in order"""
+        bits = self.bits
+        for frame in range(self.frames):
+            yield bool(bits[frame >> 3] >> (frame & 7) & 1)
+
+    def to_bytes(self):
+        name = self.character.encode("utf-8")
+        return (_HEADER.pack(MAGIC, VERSION, self.seed, self.frames, self.score)
+                + bytes([len(name)]) + name + zlib.compress(bytes(self.bits), 9))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size + 1:
+            raise ReplayError("replay is truncated")
+        magic, version, seed, frames, score = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("not a Flappy replay")
+        if version != VERSION:
+            raise ReplayError(f"unsupported replay version {version}")
+        offset = _HEADER.size
+        name_length = data[offset]
+        name = data[offset + 1:offset + 1 + name_length]
+        if len(name) != name_length:
+            raise ReplayError("replay is truncated")
+        try:
+            character = name.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ReplayError("character name is not valid UTF-8") from None
+        expected = (frames + 7) // 8
+        # Bounded, so a crafted stream cannot inflate far past the frame count
+        stream = zlib.decompressobj()
+        try:
+            bits = stream.decompress(data[offset + 1 + name_length:], expected + 1)
+        except zlib.error as e:
+            raise ReplayError(f"corrupt input stream: {e}") from None
+        if len(bits) != expected or not stream.eof or stream.unconsumed_tail or stream.unused_data:
+            raise ReplayError("input stream length does not match frame count")
+        return cls(seed, character, score, frames, bits)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
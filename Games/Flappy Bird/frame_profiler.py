@@ -0,0 +1,189 @@
+"""Opt-in per-frame phase timing with rolling percentiles and CSV/JSON export.
+
+Wrap each phase of a frame in ``with profiler.phase("name"):`` and call
+``end_frame()`` once per frame. Phases entered several times in one frame
+(e.g. multiple fixed-timestep updates) accumulate into that frame's total.
+
+LatencyLog collects per-input latency samples by stage, and LatencyProbe
+feeds it synthetic key presses at random times for unattended measurement.
+"""
+import contextlib
+import csv
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import pygame
+
+class _PhaseTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+class FrameProfiler:
+    def __init__(self, window=600, keep_frames=False):
+        self.window = window  # Frames kept for the rolling statistics
+        self.phase_names = []  # In first-seen order, for stable columns
+        self.samples = {}  # Phase name -> deque of per-frame ns
+        self.timers = {}
+        self.current = {}
+        # Every frame's phase times when they will be exported, else just the window
+        self.frames = [] if keep_frames else deque(maxlen=window)
+        self.frame_start = time.perf_counter_ns()
+
+    def phase(self, name):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = _PhaseTimer(self, name)
+            self.phase_names.append(name)
+            self.samples[name] = deque(maxlen=self.window)
+        return timer
+
+    def add(self, name, elapsed_ns):
+        self.current[name] = self.current.get(name, 0) + elapsed_ns
+
+    def end_frame(self):
+        """Close the current frame; its wall time is recorded as "frame" """
+        now = time.perf_counter_ns()
+        self.current["frame"] = now - self.frame_start
+        self.frame_start = now
+        if "frame" not in self.samples:
+            self.samples["frame"] = deque(maxlen=self.window)
+        for name, values in self.samples.items():
+            values.append(self.current.get(name, 0))
+        self.frames.append(self.current)
+        self.current = {}
+
+    def stats(self, name):
+        """p50/p95/p99/max of the rolling window, in milliseconds"""
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        def percentile(p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))] / 1e6
+        return {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99),
+                "max": values[-1] / 1e6}
+
+    def summary(self):
+        return {name: self.stats(name) for name in self.phase_names + ["frame"]}
+
+    def render_overlay(self, font, color=(255, 255, 255), background=(0, 0, 0, 170)):
+        """Render the rolling statistics as a translucent table"""
+        lines = [f"{'phase':<16}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>7}  ms"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<16}{s['p50']:7.2f}{s['p95']:7.2f}{s['p99']:7.2f}{s['max']:7.2f}")
+        rendered = [font.render(line, True, color) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 8
+        height = sum(surface.get_height() for surface in rendered) + 8
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill(background)
+        y = 4
+        for surface in rendered:
+            overlay.blit(surface, (4, y))
+            y += surface.get_height()
+        return overlay
+
+    def export(self, path):
+        """Write the recorded frames to path as CSV, or as JSON if it ends in .json"""
+        columns = self.phase_names + ["frame"]
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"unit": "ns", "summary_ms": self.summary(), "phases": columns,
+                           "frames": [[frame.get(name, 0) for name in columns]
+                                      for frame in self.frames]}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame_index"] + [f"{name}_ns" for name in columns])
+                for i, frame in enumerate(self.frames):
+                    writer.writerow([i] + [frame.get(name, 0) for name in columns])
+
+class NullProfiler:
+    """Stand-in used when profiling is off; phases cost one no-op context"""
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def end_frame(self):
+        pass
+
+class LatencyLog:
+    """Every latency sample (seconds) by stage, e.g. input_to_tick, input_to_present"""
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def stats(self, stage):
+        """count and p50/p95/p99/max in milliseconds"""
+        values = sorted(self.samples.get(stage, ()))
+        if not values:
+            return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        def percentile(p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000
+        return {"count": len(values), "p50": percentile(50), "p95": percentile(95),
+                "p99": percentile(99), "max": values[-1] * 1000}
+
+    def report(self):
+        lines = [f"{'latency':<18}{'count':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  ms"]
+        for stage in self.samples:
+            s = self.stats(stage)
+            lines.append(f"{stage:<18}{s['count']:7d}{s['p50']:8.2f}{s['p95']:8.2f}"
+                         f"{s['p99']:8.2f}{s['max']:8.2f}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Write every sample to path as CSV, or as JSON if it ends in .json"""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"unit": "ms", "summary": {stage: self.stats(stage) for stage in self.samples},
+                           "samples": {stage: [value * 1000 for value in values]
+                                       for stage, values in self.samples.items()}}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "latency_ms"])
+                for stage, values in self.samples.items():
+                    writer.writerows([stage, value * 1000] for value in values)
+
+class LatencyProbe:
+    """Posts KEYDOWN events from a background thread at random moments.
+
+    Each event carries ``sent`` (its perf_counter time), so latencies can be
+    measured from the moment of the press rather than when it was read.
+    """
+    def __init__(self, key, interval=(0.25, 0.6), seed=None):
+        self.key = key
+        self.interval = interval
+        self.rng = random.Random(seed)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.press, name="latency-probe", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def press(self):
+        while not self.stopped.wait(self.rng.uniform(*self.interval)):
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=self.key, mod=0,
+                                                 unicode="", scancode=0,
+                                                 sent=time.perf_counter()))
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
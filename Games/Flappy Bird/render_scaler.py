@@ -0,0 +1,109 @@
+"""Presents a fixed logical-resolution canvas in a window of any size.
+
+The game always draws at its logical resolution; RenderScaler fits that
+canvas into the window (aspect preserved, letterboxed) and upscales it once
+per frame. The render scale is the resolution of the smoothing pass as a
+fraction of the viewport: 1.0 smoothscales straight to the viewport, lower
+scales smoothscale to a smaller intermediate and stretch that with a cheap
+nearest-neighbour scale, and NEAREST skips smoothing altogether.
+
+With automatic scaling the scale steps down when the frame's busy time
+stays over budget and back up once the costlier level's measured present
+time would fit again, so gameplay holds its frame rate on slow machines.
+"""
+import time
+
+import pygame
+
+NEAREST = 0.0
+RENDER_SCALES = (1.0, 0.5, NEAREST)  # Best quality first (0.75 was no cheaper than 1.0)
+
+# Governor tuning: busy-time fractions of the frame budget and how many
+# consecutive frames must agree before the scale changes
+SCALE_DOWN_AT = 0.9
+SCALE_UP_AT = 0.7
+SCALE_DOWN_FRAMES = 30
+SCALE_UP_FRAMES = 180
+SMOOTHING = 0.1  # Weight of the newest sample in the moving averages
+
+def fit_viewport(logical_size, window_size):
+    """Largest rect of the logical aspect ratio centred in the window"""
+    logical_width, logical_height = logical_size
+    window_width, window_height = window_size
+    factor = min(window_width / logical_width, window_height / logical_height)
+    width = max(1, round(logical_width * factor))
+    height = max(1, round(logical_height * factor))
+    return pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+
+class RenderScaler:
+    def __init__(self, logical_size, window_size, budget, scale=None):
+        self.logical_size = logical_size
+        self.viewport = fit_viewport(logical_size, window_size)
+        self.budget = budget  # Seconds of busy time allowed per frame
+        self.automatic = scale is None
+        self.level = 0 if scale is None else RENDER_SCALES.index(scale)
+        self.costs = [None] * len(RENDER_SCALES)  # Average present() seconds per level
+        self.load = None  # Average busy seconds per frame at the current level
+        self.over = 0  # Consecutive frames over / under the thresholds
+        self.under = 0
+        self.intermediates = {}
+
+    @property
+    def scale(self):
+        return RENDER_SCALES[self.level]
+
+    def intermediate(self, scale):
+        surface = self.intermediates.get(scale)
+        if surface is None:
+            size = (max(1, round(self.viewport.width * scale)),
+                    max(1, round(self.viewport.height * scale)))
+            surface = self.intermediates[scale] = pygame.Surface(size).convert()
+        return surface
+
+    def present(self, canvas, window):
+        """Scale the canvas into the window's viewport; returns the rect to update"""
+        started = time.perf_counter()
+        scale = self.scale
+        target = window.subsurface(self.viewport)
+        if scale == NEAREST:
+            pygame.transform.scale(canvas, self.viewport.size, target)
+        elif scale == 1.0:
+            pygame.transform.smoothscale(canvas, self.viewport.size, target)
+        else:
+            middle = self.intermediate(scale)
+            pygame.transform.smoothscale(canvas, middle.get_size(), middle)
+            pygame.transform.scale(middle, self.viewport.size, target)
+        del target  # Unlock the window
+        cost = time.perf_counter() - started
+        previous = self.costs[self.level]
+        self.costs[self.level] = cost if previous is None else previous + (cost - previous) * SMOOTHING
+        return self.viewport
+
+    def end_frame(self, busy):
+        """Feed one frame's busy time (everything but the idle wait) to the governor"""
+        self.load = busy if self.load is None else self.load + (busy - self.load) * SMOOTHING
+        if not self.automatic:
+            return
+        if self.load > self.budget * SCALE_DOWN_AT:
+            self.under = 0
+            self.over += 1
+            if self.over >= SCALE_DOWN_FRAMES and self.level < len(RENDER_SCALES) - 1:
+                self.set_level(self.level + 1)
+            return
+        self.over = 0
+        if self.level == 0:
+            return
+        # Step up only if swapping in the costlier level's present time still fits
+        current, richer = self.costs[self.level], self.costs[self.level - 1]
+        projected = self.load + (richer or 0.0) - (current or 0.0)
+        if projected > self.budget * SCALE_UP_AT:
+            self.under = 0
+            return
+        self.under += 1
+        if self.under >= SCALE_UP_FRAMES:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        self.level = level
+        self.load = None  # Re-measure at the new level before deciding again
+        self.over = self.under = 0
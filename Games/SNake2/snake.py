@@ -2,8 +2,6 @@ import pygame
 import random
 import sys
 
-pygame.init()
-
 WIDTH, HEIGHT = 600, 400
 CELL_SIZE = 20
 CELL_NUMBER_X = WIDTH // CELL_SIZE
@@ -2,8 +2,6 @@ import pygame
 import sys
 import random
 
-pygame.init()
-
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 GRID_SIZE = 20
@@ -71,6 +69,7 @@ class Game:
         self.snake = Snake()
         self.food = Food()
         self.score = 0
+        pygame.font.init()
         self.font = pygame.font.Font(None, 36)
         self.running = True
     
@@ -1,16 +1,19 @@
+import argparse
 import pygame
-import random
 import sys
-from enum import Enum
+from collections import OrderedDict
 
-pygame.init()
+from bomberman_engine import (BombermanEngine, GRID_SIZE, GRID_HEIGHT, MIN_MAP_SIZE, MAX_MAP_SIZE,
+                              EMPTY, WALL, BRICK, BOMB, POWER_UP, STAY, UP, DOWN, LEFT, RIGHT)
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 640
-GRID_SIZE = 15
-GRID_HEIGHT = 11
 CELL_SIZE = 40
 FPS = 60
+VIEW_WIDTH = SCREEN_WIDTH  # The map viewport; the HUD sits below it
+VIEW_HEIGHT = GRID_HEIGHT * CELL_SIZE
+CHUNK = 16  # Map layer chunks are CHUNK x CHUNK cells
+MAX_CHUNKS = 64  # Rendered chunks kept before the least recently shown are dropped
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -23,310 +26,217 @@ GRAY = (128, 128, 128)
 DARK_GRAY = (64, 64, 64)
 BROWN = (139, 69, 19)
 
-class CellType(Enum):
-    EMPTY = 0
-    WALL = 1
-    BRICK = 2
-    BOMB = 3
-    EXPLOSION = 4
-    POWER_UP = 5
+def build_tile_atlas():
+    """One CELL_SIZE tile per cell code, side by side; bombs sit on empty floor"""
+    codes = (EMPTY, WALL, BRICK, BOMB, POWER_UP)
+    atlas = pygame.Surface((CELL_SIZE * (max(codes) + 1), CELL_SIZE)).convert()
+    atlas.fill(BLACK)
+    for code in codes:
+        x = code * CELL_SIZE
+        if code == WALL:
+            pygame.draw.rect(atlas, DARK_GRAY, (x, 0, CELL_SIZE, CELL_SIZE))
+            pygame.draw.rect(atlas, GRAY, (x + 2, 2, CELL_SIZE - 4, CELL_SIZE - 4))
+        elif code == BRICK:
+            pygame.draw.rect(atlas, BROWN, (x, 0, CELL_SIZE, CELL_SIZE))
+            pygame.draw.rect(atlas, BLACK, (x, 0, CELL_SIZE, CELL_SIZE), 1)
+        elif code == POWER_UP:
+            pygame.draw.rect(atlas, GREEN, (x + 10, 10, CELL_SIZE - 20, CELL_SIZE - 20))
+    return atlas
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+class MapLayer:
+    """The engine's grid pre-rendered from the atlas in chunks, patched only where tiles change.
 
-class Player:
-    def __init__(self, x, y):
-        self.grid_x = x
-        self.grid_y = y
-        self.x = x * CELL_SIZE + CELL_SIZE // 2
-        self.y = y * CELL_SIZE + CELL_SIZE // 2
-        self.speed = 2
-        self.bomb_count = 1
-        self.bomb_power = 2
-        self.max_bombs = 1
-        self.placed_bombs = []
-        self.alive = True
-        self.move_cooldown = 0
-        
-    def move(self, dx, dy, game_map):
-        if self.move_cooldown > 0:
-            return
-            
-        new_grid_x = self.grid_x + dx
-        new_grid_y = self.grid_y + dy
-        
-        if (0 <= new_grid_x < GRID_SIZE and 
-            0 <= new_grid_y < GRID_HEIGHT and
-            game_map[new_grid_y][new_grid_x] in [CellType.EMPTY, CellType.POWER_UP]):
-            
-            if game_map[new_grid_y][new_grid_x] == CellType.POWER_UP:
-                self.collect_powerup()
-                game_map[new_grid_y][new_grid_x] = CellType.EMPTY
-            
-            self.grid_x = new_grid_x
-            self.grid_y = new_grid_y
-            self.x = self.grid_x * CELL_SIZE + CELL_SIZE // 2
-            self.y = self.grid_y * CELL_SIZE + CELL_SIZE // 2
-            self.move_cooldown = 8
-    
-    def collect_powerup(self):
-        power_type = random.choice(['bombs', 'power'])
-        if power_type == 'bombs':
-            self.max_bombs += 1
-        else:
-            self.bomb_power += 1
-    
-    def place_bomb(self, game_map):
-        if len(self.placed_bombs) < self.max_bombs:
-            if game_map[self.grid_y][self.grid_x] == CellType.EMPTY:
-                bomb = Bomb(self.grid_x, self.grid_y, self.bomb_power)
-                self.placed_bombs.append(bomb)
-                game_map[self.grid_y][self.grid_x] = CellType.BOMB
-                return bomb
-        return None
-    
-    def update(self):
-        if self.move_cooldown > 0:
-            self.move_cooldown -= 1
-    
-    def draw(self, screen):
-        if self.alive:
-            pygame.draw.circle(screen, BLUE, (self.x, self.y), CELL_SIZE // 3)
-            pygame.draw.circle(screen, WHITE, (self.x - 5, self.y - 5), 3)
+    Chunks are rendered when they first come into view and the least recently
+    shown are dropped past MAX_CHUNKS, so memory follows the viewport rather
+    than the map size.
+    """
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self.chunks = OrderedDict()  # (chunk x, chunk y) -> Surface
+        self.grid = None  # The grid last drawn; a new one means the engine was reset
 
-class Enemy:
-    def __init__(self, x, y):
-        self.grid_x = x
-        self.grid_y = y
-        self.x = x * CELL_SIZE + CELL_SIZE // 2
-        self.y = y * CELL_SIZE + CELL_SIZE // 2
-        self.speed = 1
-        self.alive = True
-        self.move_cooldown = 0
-        self.direction = random.choice(list(Direction))
-        
-    def move(self, game_map):
-        if self.move_cooldown > 0:
-            self.move_cooldown -= 1
-            return
-        
-        if random.random() < 0.3:
-            self.direction = random.choice(list(Direction))
-        
-        dx, dy = self.direction.value
-        new_grid_x = self.grid_x + dx
-        new_grid_y = self.grid_y + dy
-        
-        if (0 <= new_grid_x < GRID_SIZE and 
-            0 <= new_grid_y < GRID_HEIGHT and
-            game_map[new_grid_y][new_grid_x] == CellType.EMPTY):
-            self.grid_x = new_grid_x
-            self.grid_y = new_grid_y
-            self.x = self.grid_x * CELL_SIZE + CELL_SIZE // 2
-            self.y = self.grid_y * CELL_SIZE + CELL_SIZE // 2
-            self.move_cooldown = 20
+    def tile(self, code):
+        return pygame.Rect(code * CELL_SIZE, 0, CELL_SIZE, CELL_SIZE)
+
+    def render_chunk(self, engine, cx, cy):
+        x0, y0 = cx * CHUNK, cy * CHUNK
+        columns = min(CHUNK, engine.width - x0)
+        rows = min(CHUNK, engine.height - y0)
+        surface = pygame.Surface((columns * CELL_SIZE, rows * CELL_SIZE)).convert()
+        grid, width, blit, tile = engine.grid, engine.width, surface.blit, self.tile
+        for y in range(rows):
+            row = (y0 + y) * width + x0
+            for x in range(columns):
+                blit(self.atlas, (x * CELL_SIZE, y * CELL_SIZE), tile(grid[row + x]))
+        return surface
+
+    def draw(self, screen, engine, origin, view):
+        """Blit the chunks overlapping `view` (screen rect) with the map scrolled to `origin`"""
+        if engine.grid is not self.grid:
+            self.grid = engine.grid
+            self.chunks.clear()
+        grid, width, tile = engine.grid, engine.width, self.tile
+        for index in engine.changed:
+            x, y = index % width, index // width
+            surface = self.chunks.get((x // CHUNK, y // CHUNK))
+            if surface is not None:
+                surface.blit(self.atlas, ((x % CHUNK) * CELL_SIZE, (y % CHUNK) * CELL_SIZE),
+                             tile(grid[index]))
+        engine.changed.clear()
+
+        span = CHUNK * CELL_SIZE
+        ox, oy = origin
+        last_x = min(engine.width * CELL_SIZE, ox + view.width) - 1
+        last_y = min(engine.height * CELL_SIZE, oy + view.height) - 1
+        for cy in range(oy // span, last_y // span + 1):
+            for cx in range(ox // span, last_x // span + 1):
+                surface = self.chunks.get((cx, cy))
+                if surface is None:
+                    surface = self.chunks[cx, cy] = self.render_chunk(engine, cx, cy)
+                    if len(self.chunks) > MAX_CHUNKS:
+                        self.chunks.popitem(last=False)
+                else:
+                    self.chunks.move_to_end((cx, cy))
+                screen.blit(surface, (view.x + cx * span - ox, view.y + cy * span - oy))
+
+def camera_origin(engine, view):
+    """Top-left map pixel shown in the view: centred on the player, clamped to the map"""
+    player = engine.player
+    origin = []
+    for cell, cells, extent in ((player.grid_x, engine.width, view.width),
+                                (player.grid_y, engine.height, view.height)):
+        size = cells * CELL_SIZE
+        if size <= extent:
+            origin.append(0)
         else:
-            self.direction = random.choice(list(Direction))
-    
-    def draw(self, screen):
-        if self.alive:
-            pygame.draw.circle(screen, RED, (self.x, self.y), CELL_SIZE // 3)
-            pygame.draw.circle(screen, YELLOW, (self.x - 5, self.y - 5), 3)
+            centre = cell * CELL_SIZE + CELL_SIZE // 2
+            origin.append(min(max(centre - extent // 2, 0), size - extent))
+    return tuple(origin)
 
-class Bomb:
-    def __init__(self, x, y, power):
-        self.grid_x = x
-        self.grid_y = y
-        self.x = x * CELL_SIZE + CELL_SIZE // 2
-        self.y = y * CELL_SIZE + CELL_SIZE // 2
-        self.power = power
-        self.timer = 180
-        self.exploded = False
-        
-    def update(self):
-        self.timer -= 1
-        if self.timer <= 0:
-            self.exploded = True
-            return True
-        return False
-    
-    def draw(self, screen):
-        if not self.exploded:
-            size = CELL_SIZE // 3 + int(2 * abs(self.timer % 40 - 20) / 20)
-            pygame.draw.circle(screen, BLACK, (self.x, self.y), size)
-            pygame.draw.circle(screen, ORANGE, (self.x, self.y - size // 2), 3)
+def cell_center(x, y, origin=(0, 0)):
+    return x * CELL_SIZE + CELL_SIZE // 2 - origin[0], y * CELL_SIZE + CELL_SIZE // 2 - origin[1]
 
-class Explosion:
-    def __init__(self, positions):
-        self.positions = positions
-        self.timer = 30
-        
-    def update(self):
-        self.timer -= 1
-        return self.timer <= 0
-    
-    def draw(self, screen):
-        for x, y in self.positions:
-            center_x = x * CELL_SIZE + CELL_SIZE // 2
-            center_y = y * CELL_SIZE + CELL_SIZE // 2
-            size = CELL_SIZE // 2
-            pygame.draw.circle(screen, YELLOW, (center_x, center_y), size)
-            pygame.draw.circle(screen, ORANGE, (center_x, center_y), size - 5)
+def draw_player(screen, player, origin):
+    if player.alive:
+        x, y = cell_center(player.grid_x, player.grid_y, origin)
+        pygame.draw.circle(screen, BLUE, (x, y), CELL_SIZE // 3)
+        pygame.draw.circle(screen, WHITE, (x - 5, y - 5), 3)
+
+def draw_enemy(screen, enemy, origin):
+    if enemy.alive:
+        x, y = cell_center(enemy.grid_x, enemy.grid_y, origin)
+        pygame.draw.circle(screen, RED, (x, y), CELL_SIZE // 3)
+        pygame.draw.circle(screen, YELLOW, (x - 5, y - 5), 3)
+
+def draw_bomb(screen, bomb, origin):
+    x, y = cell_center(bomb.grid_x, bomb.grid_y, origin)
+    size = CELL_SIZE // 3 + int(2 * abs(bomb.timer % 40 - 20) / 20)
+    pygame.draw.circle(screen, BLACK, (x, y), size)
+    pygame.draw.circle(screen, ORANGE, (x, y - size // 2), 3)
+
+def draw_explosion(screen, explosion, origin, visible):
+    size = CELL_SIZE // 2
+    for x, y in explosion.positions:
+        if visible.collidepoint(x, y):
+            center = cell_center(x, y, origin)
+            pygame.draw.circle(screen, YELLOW, center, size)
+            pygame.draw.circle(screen, ORANGE, center, size - 5)
+
+def parse_size(text):
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT in cells, got {text!r}") from None
+    if not (MIN_MAP_SIZE <= width <= MAX_MAP_SIZE and MIN_MAP_SIZE <= height <= MAX_MAP_SIZE):
+        raise argparse.ArgumentTypeError(
+            f"map sides must be {MIN_MAP_SIZE}..{MAX_MAP_SIZE} cells, got {text!r}")
+    return width, height
+
+def parse_count(text):
+    count = int(text)
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {count}")
+    return count
 
 class Game:
-    def __init__(self):
+    def __init__(self, map_size=(GRID_SIZE, GRID_HEIGHT), enemies=None):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Bomberman")
         self.clock = pygame.time.Clock()
+        pygame.font.init()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.map_size = map_size
+        self.enemy_count = enemies
+        self.view = pygame.Rect(0, 0, VIEW_WIDTH, VIEW_HEIGHT)
+        self.map_layer = MapLayer(build_tile_atlas())
         self.reset_game()
         
     def reset_game(self):
-        self.game_map = self.generate_map()
-        self.player = Player(1, 1)
-        self.enemies = [
-            Enemy(GRID_SIZE - 2, 1),
-            Enemy(1, GRID_HEIGHT - 2),
-            Enemy(GRID_SIZE - 2, GRID_HEIGHT - 2)
-        ]
-        self.bombs = []
-        self.explosions = []
-        self.game_over = False
-        self.victory = False
-        self.score = 0
-        
-    def generate_map(self):
-        game_map = [[CellType.EMPTY for _ in range(GRID_SIZE)] for _ in range(GRID_HEIGHT)]
-        
-        for i in range(GRID_HEIGHT):
-            for j in range(GRID_SIZE):
-                if i == 0 or i == GRID_HEIGHT - 1 or j == 0 or j == GRID_SIZE - 1:
-                    game_map[i][j] = CellType.WALL
-                elif i % 2 == 0 and j % 2 == 0:
-                    game_map[i][j] = CellType.WALL
-                elif random.random() < 0.7:
-                    if not ((i <= 2 and j <= 2) or 
-                            (i >= GRID_HEIGHT - 3 and j >= GRID_SIZE - 3) or
-                            (i <= 2 and j >= GRID_SIZE - 3) or
-                            (i >= GRID_HEIGHT - 3 and j <= 2)):
-                        game_map[i][j] = CellType.BRICK
-        
-        return game_map
-    
-    def handle_explosion(self, bomb):
-        explosion_positions = [(bomb.grid_x, bomb.grid_y)]
-        self.game_map[bomb.grid_y][bomb.grid_x] = CellType.EMPTY
-        
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        for dx, dy in directions:
-            for i in range(1, bomb.power + 1):
-                x = bomb.grid_x + dx * i
-                y = bomb.grid_y + dy * i
-                
-                if 0 <= x < GRID_SIZE and 0 <= y < GRID_HEIGHT:
-                    if self.game_map[y][x] == CellType.WALL:
-                        break
-                    elif self.game_map[y][x] == CellType.BRICK:
-                        explosion_positions.append((x, y))
-                        if random.random() < 0.3:
-                            self.game_map[y][x] = CellType.POWER_UP
-                        else:
-                            self.game_map[y][x] = CellType.EMPTY
-                        self.score += 10
-                        break
-                    else:
-                        explosion_positions.append((x, y))
-                        
-                        if self.player.grid_x == x and self.player.grid_y == y:
-                            self.player.alive = False
-                            self.game_over = True
-                        
-                        for enemy in self.enemies:
-                            if enemy.alive and enemy.grid_x == x and enemy.grid_y == y:
-                                enemy.alive = False
-                                self.score += 100
-        
-        return Explosion(explosion_positions)
-    
+        self.engine = BombermanEngine(*self.map_size, enemies=self.enemy_count)
+        self.bomb_requested = False
+
+    @property
+    def game_over(self):
+        return self.engine.game_over
+
+    @property
+    def victory(self):
+        return self.engine.victory
+
+    @property
+    def score(self):
+        return self.engine.score
+
     def update(self):
-        if self.game_over or self.victory:
-            return
-        
         keys = pygame.key.get_pressed()
         if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.player.move(0, -1, self.game_map)
+            move = UP
         elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.player.move(0, 1, self.game_map)
+            move = DOWN
         elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.player.move(-1, 0, self.game_map)
+            move = LEFT
         elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.player.move(1, 0, self.game_map)
-        
-        self.player.update()
-        
-        for enemy in self.enemies:
-            if enemy.alive:
-                enemy.move(self.game_map)
-                if enemy.grid_x == self.player.grid_x and enemy.grid_y == self.player.grid_y:
-                    self.player.alive = False
-                    self.game_over = True
-        
-        for bomb in self.bombs[:]:
-            if bomb.update():
-                explosion = self.handle_explosion(bomb)
-                self.explosions.append(explosion)
-                self.bombs.remove(bomb)
-                if bomb in self.player.placed_bombs:
-                    self.player.placed_bombs.remove(bomb)
-        
-        for explosion in self.explosions[:]:
-            if explosion.update():
-                self.explosions.remove(explosion)
-        
-        if all(not enemy.alive for enemy in self.enemies):
-            self.victory = True
+            move = RIGHT
+        else:
+            move = STAY
+        self.engine.step(move, self.bomb_requested)
+        self.bomb_requested = False
     
     def draw(self):
+        """Render the engine's current state"""
+        engine = self.engine
         self.screen.fill(BLACK)
         
-        for i in range(GRID_HEIGHT):
-            for j in range(GRID_SIZE):
-                x = j * CELL_SIZE
-                y = i * CELL_SIZE
-                
-                if self.game_map[i][j] == CellType.WALL:
-                    pygame.draw.rect(self.screen, DARK_GRAY, (x, y, CELL_SIZE, CELL_SIZE))
-                    pygame.draw.rect(self.screen, GRAY, (x + 2, y + 2, CELL_SIZE - 4, CELL_SIZE - 4))
-                elif self.game_map[i][j] == CellType.BRICK:
-                    pygame.draw.rect(self.screen, BROWN, (x, y, CELL_SIZE, CELL_SIZE))
-                    pygame.draw.rect(self.screen, BLACK, (x, y, CELL_SIZE, CELL_SIZE), 1)
-                elif self.game_map[i][j] == CellType.POWER_UP:
-                    pygame.draw.rect(self.screen, GREEN, (x + 10, y + 10, CELL_SIZE - 20, CELL_SIZE - 20))
-                else:
-                    pygame.draw.rect(self.screen, BLACK, (x, y, CELL_SIZE, CELL_SIZE), 1)
+        origin = camera_origin(engine, self.view)
+        self.screen.set_clip(self.view)
+        self.map_layer.draw(self.screen, engine, origin, self.view)
         
-        for bomb in self.bombs:
-            bomb.draw(self.screen)
+        # Only what overlaps the view: cells first_x..last_x, first_y..last_y
+        first_x, first_y = origin[0] // CELL_SIZE, origin[1] // CELL_SIZE
+        last_x = (origin[0] + self.view.width - 1) // CELL_SIZE
+        last_y = (origin[1] + self.view.height - 1) // CELL_SIZE
+        visible = pygame.Rect(first_x, first_y, last_x - first_x + 1, last_y - first_y + 1)
+        for bomb in engine.bombs:
+            if visible.collidepoint(bomb.grid_x, bomb.grid_y):
+                draw_bomb(self.screen, bomb, origin)
         
-        for explosion in self.explosions:
-            explosion.draw(self.screen)
+        for explosion in engine.explosions:
+            draw_explosion(self.screen, explosion, origin, visible)
         
-        self.player.draw(self.screen)
+        draw_player(self.screen, engine.player, origin)
         
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+        for enemy in engine.enemies_near(first_x, first_y, last_x, last_y):
+            draw_enemy(self.screen, enemy, origin)
+        self.screen.set_clip(None)
         
         score_text = self.small_font.render(f"Score: {self.score}", True, WHITE)
         self.screen.blit(score_text, (10, GRID_HEIGHT * CELL_SIZE + 10))
         
-        bombs_text = self.small_font.render(f"Bombs: {self.player.max_bombs}", True, WHITE)
+        bombs_text = self.small_font.render(f"Bombs: {engine.player.max_bombs}", True, WHITE)
         self.screen.blit(bombs_text, (150, GRID_HEIGHT * CELL_SIZE + 10))
         
-        power_text = self.small_font.render(f"Power: {self.player.bomb_power}", True, WHITE)
+        power_text = self.small_font.render(f"Power: {engine.player.bomb_power}", True, WHITE)
         self.screen.blit(power_text, (280, GRID_HEIGHT * CELL_SIZE + 10))
         
         controls_text = self.small_font.render("Move: Arrow Keys/WASD | Bomb: Space | Restart: R", True, WHITE)
@@ -353,10 +263,7 @@ class Game:
                     running = False
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        if not self.game_over and not self.victory:
-                            bomb = self.player.place_bomb(self.game_map)
-                            if bomb:
-                                self.bombs.append(bomb)
+                        self.bomb_requested = True
                     elif event.key == pygame.K_r:
                         self.reset_game()
                     elif event.key == pygame.K_ESCAPE:
@@ -369,6 +276,15 @@ class Game:
         pygame.quit()
         sys.exit()
 
+def main():
+    parser = argparse.ArgumentParser(description="Bomberman")
+    parser.add_argument("--size", type=parse_size, default=(GRID_SIZE, GRID_HEIGHT),
+                        help="map size in cells, WIDTHxHEIGHT; larger maps scroll with the player "
+                             "(default: %(default)s)")
+    parser.add_argument("--enemies", type=parse_count,
+                        help="enemies placed at random (default: one in each free corner)")
+    args = parser.parse_args()
+    Game(args.size, args.enemies).run()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,473 @@
+"""Display-free Bomberman core.
+
+The map is one contiguous bytearray of cell codes, row-major, indexed
+y * width + x. The border is always wall, so neighbour lookups need no
+bounds checks. For every cell the engine also keeps, per direction, how
+many open cells follow it before the first WALL or BRICK, so a blast is
+resolved from four table lookups whatever its power.
+
+Enemies share two maps rebuilt only when their inputs change: a
+breadth-first distance field toward the player (within CHASE_RANGE) and
+a danger map of cells covered by pending bombs. Each enemy then decides
+from its four neighbours, so a tick costs the same per enemy however
+many there are.
+
+Maps can be anything from MIN_MAP_SIZE to MAX_MAP_SIZE cells a side. Live
+enemies are also filed in a spatial hash of BUCKET-cell squares, so a
+blast only tests the enemies near its rays. All randomness comes from a private random.Random, so a
+seed reproduces a whole game given the same inputs. Nothing here imports
+pygame; bomberman.py renders an engine and feeds it keyboard input.
+"""
+import itertools
+import random
+from array import array
+from collections import deque
+
+GRID_SIZE = 15  # Default map width in cells
+GRID_HEIGHT = 11
+MIN_MAP_SIZE = 5
+MAX_MAP_SIZE = 1024  # Ray and distance tables hold 16-bit lengths
+
+# Cell codes stored in BombermanEngine.grid
+EMPTY = 0
+WALL = 1
+BRICK = 2
+BOMB = 3
+POWER_UP = 5
+
+# Player moves for step(); enemies use the same four directions
+STAY = 0
+UP = 1
+DOWN = 2
+LEFT = 3
+RIGHT = 4
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))  # UP, DOWN, LEFT, RIGHT
+MOVES = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+
+# Timings in ticks
+PLAYER_MOVE_COOLDOWN = 8
+ENEMY_MOVE_COOLDOWN = 20
+BOMB_TIMER = 180
+EXPLOSION_TIMER = 30
+
+BRICK_CHANCE = 0.7
+POWER_UP_CHANCE = 0.3
+ENEMY_TURN_CHANCE = 0.3
+CHASE_RANGE = 24  # Cells of path within which enemies hunt the player
+UNREACHED = 0xFFFF
+SPAWN_CLEARANCE = 6  # Cells between the player and randomly placed enemies, on large maps
+BUCKET_SHIFT = 3  # Spatial hash squares are 8x8 cells
+
+class Player:
+    def __init__(self, x, y):
+        self.grid_x = x
+        self.grid_y = y
+        self.bomb_power = 2
+        self.max_bombs = 1
+        self.active_bombs = 0  # Placed and not yet exploded
+        self.alive = True
+        self.move_cooldown = 0
+
+class Enemy:
+    def __init__(self, x, y, direction):
+        self.grid_x = x
+        self.grid_y = y
+        self.direction = direction  # (dx, dy)
+        self.alive = True
+        self.move_cooldown = 0
+
+class Bomb:
+    def __init__(self, x, y, power, owner=None):
+        self.grid_x = x
+        self.grid_y = y
+        self.power = power
+        self.owner = owner
+        self.timer = BOMB_TIMER
+
+class Explosion:
+    def __init__(self, x, y, reach):
+        self.grid_x = x
+        self.grid_y = y
+        self.reach = reach  # Cells blasted along each of DIRECTIONS
+        self.timer = EXPLOSION_TIMER
+
+    @property
+    def positions(self):
+        """Every blasted cell, centre first"""
+        cells = [(self.grid_x, self.grid_y)]
+        for (dx, dy), length in zip(DIRECTIONS, self.reach):
+            cells.extend((self.grid_x + dx * k, self.grid_y + dy * k) for k in range(1, length + 1))
+        return cells
+
+    def covers(self, x, y):
+        up, down, left, right = self.reach
+        if x == self.grid_x:
+            return -up <= y - self.grid_y <= down
+        return y == self.grid_y and -left <= x - self.grid_x <= right
+
+class BombermanEngine:
+    """One Bomberman game advanced a tick at a time by step(move, bomb)"""
+    def __init__(self, width=GRID_SIZE, height=GRID_HEIGHT, seed=None, enemies=None):
+        for size in (width, height):
+            if not MIN_MAP_SIZE <= size <= MAX_MAP_SIZE:
+                raise ValueError(f"map sides must be {MIN_MAP_SIZE}..{MAX_MAP_SIZE} cells, got {size}")
+        if enemies is not None and enemies < 0:
+            raise ValueError(f"enemy count must not be negative, got {enemies}")
+        self.width = width
+        self.height = height
+        self.enemy_count = enemies  # None: one enemy in each free corner
+        self.bucket_columns = ((width - 1) >> BUCKET_SHIFT) + 1
+        self.rng = random.Random()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.rng.seed(seed)
+        self.grid = self.generate_map()
+        self.runs = self.measure_runs()
+        self.changed = set()  # Bricks broken and power-ups taken, until a renderer takes them
+        size = self.width * self.height
+        self.distance = array("H", [UNREACHED]) * size
+        self.reached = []  # Cells given a distance by the last search
+        self.danger = bytearray(size)
+        self.endangered = []
+        self.field_stale = True  # The map or the player moved since the last search
+        self.danger_stale = False  # Bombs were placed or went off
+        w, h = self.width, self.height
+        self.player = Player(1, 1)
+        if self.enemy_count is None:
+            spawns = ((w - 2, 1), (1, h - 2), (w - 2, h - 2))
+        else:
+            spawns = self.enemy_spawns(self.enemy_count)
+        self.enemies = [Enemy(x, y, self.rng.choice(DIRECTIONS)) for x, y in spawns]
+        self.buckets = {}
+        for enemy in self.enemies:
+            self.buckets.setdefault(self.bucket(enemy.grid_x, enemy.grid_y), set()).add(enemy)
+        self.enemies_left = len(self.enemies)
+        self.bombs = []
+        self.explosions = []
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        self.victory = False
+
+    @property
+    def done(self):
+        return self.game_over or self.victory
+
+    def generate_map(self):
+        """Border and pillar walls, with random bricks outside the corner spawns"""
+        w, h = self.width, self.height
+        grid = bytearray(w * h)
+        random_value = self.rng.random
+        for y in range(h):
+            for x in range(w):
+                if y == 0 or y == h - 1 or x == 0 or x == w - 1:
+                    grid[y * w + x] = WALL
+                elif y % 2 == 0 and x % 2 == 0:
+                    grid[y * w + x] = WALL
+                elif random_value() < BRICK_CHANCE:
+                    in_spawn = (x <= 2 or x >= w - 3) and (y <= 2 or y >= h - 3)
+                    if not in_spawn:
+                        grid[y * w + x] = BRICK
+        return grid
+
+    def measure_runs(self):
+        """Per direction, the open cells after each cell before the next WALL or BRICK"""
+        w, h = self.width, self.height
+        grid = self.grid
+        runs = []
+        for dx, dy in DIRECTIONS:
+            offset = dy * w + dx
+            run = array("H", bytes(2 * w * h))
+            # Walk against the direction so each neighbour is measured first
+            order = range(w * h - 1, -1, -1) if offset > 0 else range(w * h)
+            for index in order:
+                neighbour = index + offset
+                # Only border cells look past the map edge, and their runs never matter
+                if 0 <= neighbour < w * h and grid[neighbour] != WALL and grid[neighbour] != BRICK:
+                    run[index] = run[neighbour] + 1
+            runs.append(run)
+        return runs
+
+    def open_cell(self, index):
+        """Turn a destroyed brick's open run into the runs of the cells behind it"""
+        w = self.width
+        grid = self.grid
+        for (dx, dy), run in zip(DIRECTIONS, self.runs):
+            offset = dy * w + dx
+            behind = index - offset
+            length = run[index] + 1
+            while True:
+                run[behind] = length
+                target = grid[behind]
+                if target == WALL or target == BRICK:
+                    break
+                behind -= offset
+                length += 1
+
+    def enemy_spawns(self, count):
+        """Up to `count` random empty cells well away from the player's corner.
+
+        The clearance shrinks on small maps so the far corner, which is
+        always clear, stays eligible.
+        """
+        w, h = self.width, self.height
+        clearance = min(SPAWN_CLEARANCE, (min(w, h) - 3) // 2)
+        rng = self.rng
+        spawns = set()
+        for _ in range(count * 50):
+            if len(spawns) == count:
+                break
+            x, y = rng.randrange(1, w - 1), rng.randrange(1, h - 1)
+            if self.grid[y * w + x] == EMPTY and max(x, y) - 1 > clearance:
+                spawns.add((x, y))
+        return sorted(spawns)
+
+    def bucket(self, x, y):
+        return (y >> BUCKET_SHIFT) * self.bucket_columns + (x >> BUCKET_SHIFT)
+
+    def enemies_near(self, x0, y0, x1, y1):
+        """Live enemies in the buckets overlapping cells x0..x1, y0..y1"""
+        # Clamp to the map so an oversized window cannot wrap into the next bucket row
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+        buckets = self.buckets
+        for by in range(y0 >> BUCKET_SHIFT, (y1 >> BUCKET_SHIFT) + 1):
+            row = by * self.bucket_columns
+            for bx in range(x0 >> BUCKET_SHIFT, (x1 >> BUCKET_SHIFT) + 1):
+                bucket = buckets.get(row + bx)
+                if bucket:
+                    yield from bucket
+
+    def cell(self, x, y):
+        return self.grid[y * self.width + x]
+
+    def step(self, move=STAY, bomb=False):
+        """Advance one tick: optionally drop a bomb, then move. Returns done."""
+        if self.done:
+            return True
+        self.frame += 1
+        player = self.player
+        if bomb:
+            self.place_bomb(player)
+        if move != STAY:
+            self.move_player(player, *MOVES[move])
+        if player.move_cooldown > 0:
+            player.move_cooldown -= 1
+
+        for enemy in self.enemies:
+            if enemy.move_cooldown > 0:  # Most enemies most ticks; skip the call
+                enemy.move_cooldown -= 1
+            elif enemy.alive:
+                self.move_enemy(enemy)
+        x, y = player.grid_x, player.grid_y
+        for enemy in self.enemies_near(x, y, x, y):
+            if enemy.grid_x == x and enemy.grid_y == y:
+                player.alive = False
+                self.game_over = True
+
+        due = deque()
+        for bomb in self.bombs:
+            bomb.timer -= 1
+            if bomb.timer <= 0:
+                due.append(bomb)
+        if due:
+            self.detonate(due)
+
+        if self.explosions:
+            for explosion in self.explosions:
+                explosion.timer -= 1
+            if self.explosions[0].timer <= 0:  # Oldest first
+                self.explosions = [e for e in self.explosions if e.timer > 0]
+
+        if not self.enemies_left:
+            self.victory = True
+        return self.done
+
+    def place_bomb(self, player):
+        index = player.grid_y * self.width + player.grid_x
+        if player.active_bombs < player.max_bombs and self.grid[index] == EMPTY:
+            self.grid[index] = BOMB
+            self.field_stale = self.danger_stale = True
+            self.bombs.append(Bomb(player.grid_x, player.grid_y, player.bomb_power, player))
+            player.active_bombs += 1
+
+    def move_player(self, player, dx, dy):
+        if player.move_cooldown > 0:
+            return
+        x, y = player.grid_x + dx, player.grid_y + dy
+        index = y * self.width + x
+        target = self.grid[index]
+        if target == EMPTY or target == POWER_UP:
+            if target == POWER_UP:
+                if self.rng.random() < 0.5:
+                    player.max_bombs += 1
+                else:
+                    player.bomb_power += 1
+                self.grid[index] = EMPTY
+                self.changed.add(index)
+            player.grid_x, player.grid_y = x, y
+            self.field_stale = True
+            player.move_cooldown = PLAYER_MOVE_COOLDOWN
+
+    def update_field(self):
+        """Breadth-first path lengths from the player over cells enemies can enter"""
+        self.field_stale = False
+        distance = self.distance
+        for index in self.reached:
+            distance[index] = UNREACHED
+        w = self.width
+        grid = self.grid
+        start = self.player.grid_y * w + self.player.grid_x
+        distance[start] = 0
+        reached = self.reached = [start]
+        offsets = (-w, w, -1, 1)
+        head = 0
+        while head < len(reached):
+            index = reached[head]
+            head += 1
+            step = distance[index] + 1
+            if step > CHASE_RANGE:
+                break  # Breadth-first, so every later cell is as far or farther
+            for offset in offsets:
+                neighbour = index + offset
+                if grid[neighbour] == EMPTY and distance[neighbour] == UNREACHED:
+                    distance[neighbour] = step
+                    reached.append(neighbour)
+
+    def update_danger(self):
+        """Mark every open cell a pending bomb's blast would cover"""
+        self.danger_stale = False
+        danger = self.danger
+        for index in self.endangered:
+            danger[index] = 0
+        endangered = self.endangered = []
+        w = self.width
+        for bomb in self.bombs:
+            index = bomb.grid_y * w + bomb.grid_x
+            danger[index] = 1
+            endangered.append(index)
+            for (dx, dy), run in zip(DIRECTIONS, self.runs):
+                offset = dy * w + dx
+                cell = index
+                for _ in range(min(run[index], bomb.power)):
+                    cell += offset
+                    danger[cell] = 1
+                    endangered.append(cell)
+
+    def move_enemy(self, enemy):
+        """Chase the player down the distance field, keeping out of blast lines"""
+        if self.field_stale:
+            self.update_field()
+        if self.danger_stale:
+            self.update_danger()
+        w = self.width
+        grid, distance, danger = self.grid, self.distance, self.danger
+        index = enemy.grid_y * w + enemy.grid_x
+        best = None
+        best_rank = (danger[index], distance[index])  # Staying put is the baseline
+        enclosed = True
+        for direction in DIRECTIONS:
+            dx, dy = direction
+            target = index + dy * w + dx
+            if grid[target] != EMPTY:
+                continue
+            enclosed = False
+            rank = (danger[target], distance[target])
+            if rank < best_rank:
+                best, best_rank = direction, rank
+        if enclosed:
+            enemy.move_cooldown = ENEMY_MOVE_COOLDOWN  # Look again once a move's time has passed
+            return
+        if best is None:
+            if distance[index] != UNREACHED and not danger[index]:
+                return  # Blocked from getting closer; wait for the way to open
+            best = self.wander(enemy, index)
+            if best is None:
+                return
+        enemy.direction = best
+        dx, dy = best
+        old = self.bucket(enemy.grid_x, enemy.grid_y)
+        enemy.grid_x += dx
+        enemy.grid_y += dy
+        new = self.bucket(enemy.grid_x, enemy.grid_y)
+        if new != old:
+            self.buckets[old].discard(enemy)
+            self.buckets.setdefault(new, set()).add(enemy)
+        enemy.move_cooldown = ENEMY_MOVE_COOLDOWN
+
+    def wander(self, enemy, index):
+        """Random walk for enemies out of range: mostly straight, never into danger"""
+        rng = self.rng
+        if rng.random() < ENEMY_TURN_CHANCE:
+            enemy.direction = DIRECTIONS[int(rng.random() * 4)]
+        dx, dy = enemy.direction
+        target = index + dy * self.width + dx
+        if self.grid[target] == EMPTY and self.danger[target] <= self.danger[index]:
+            return enemy.direction
+        enemy.direction = DIRECTIONS[int(rng.random() * 4)]  # Cheaper than rng.choice
+        return None
+
+    def detonate(self, due):
+        """Explode the queued bombs and every bomb their blasts reach, this tick"""
+        while due:
+            bomb = due.popleft()
+            explosion = self.explode(bomb)
+            self.explosions.append(explosion)
+            for other in self.bombs:
+                if other.timer > 0 and explosion.covers(other.grid_x, other.grid_y):
+                    other.timer = 0
+                    due.append(other)
+        self.bombs = [bomb for bomb in self.bombs if bomb.timer > 0]
+        if len(self.enemies) > self.enemies_left:
+            self.enemies = [enemy for enemy in self.enemies if enemy.alive]
+        self.field_stale = self.danger_stale = True
+
+    def explode(self, bomb):
+        """Blast along the four rays; bricks stop a ray, walls stop it before"""
+        w = self.width
+        grid = self.grid
+        x, y = bomb.grid_x, bomb.grid_y
+        index = y * w + x
+        grid[index] = EMPTY
+        bomb.timer = 0
+        if bomb.owner is not None:
+            bomb.owner.active_bombs -= 1
+        reach = []
+        blast = []  # Open cells per ray, which is where anyone can stand
+        for (dx, dy), run in zip(DIRECTIONS, self.runs):
+            length = min(run[index], bomb.power)
+            blast.append(length)
+            if length < bomb.power:
+                end = index + (length + 1) * (dy * w + dx)
+                if grid[end] == BRICK:
+                    grid[end] = POWER_UP if self.rng.random() < POWER_UP_CHANCE else EMPTY
+                    self.score += 10
+                    self.changed.add(end)
+                    self.open_cell(end)
+                    length += 1
+            reach.append(length)
+        up, down, left, right = blast
+
+        def hit(tx, ty):
+            if tx == x and ty == y:
+                return False  # The bomb's own cell has never been lethal
+            if tx == x:
+                return y - up <= ty <= y + down
+            return ty == y and x - left <= tx <= x + right
+
+        player = self.player
+        if player.alive and hit(player.grid_x, player.grid_y):
+            player.alive = False
+            self.game_over = True
+        # Enemies near the vertical ray, then the horizontal one; the dead are skipped
+        near = itertools.chain(self.enemies_near(x, y - up, x, y + down),
+                               self.enemies_near(x - left, y, x + right, y))
+        for enemy in list(near):
+            if enemy.alive and hit(enemy.grid_x, enemy.grid_y):
+                enemy.alive = False
+                self.buckets[self.bucket(enemy.grid_x, enemy.grid_y)].discard(enemy)
+                self.enemies_left -= 1
+                self.score += 100
+        return Explosion(x, y, tuple(reach))